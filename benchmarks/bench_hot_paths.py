@@ -0,0 +1,173 @@
+# Benchmark dei percorsi critici del GA su scenari a seed fisso di dimensione crescente.
+#
+#   python -m pytest benchmarks/bench_hot_paths.py --bench-json experiments/bench/current.json
+#   python -m pytest benchmarks/bench_hot_paths.py --bench-compare experiments/bench/baseline.json
+#
+# Il nome del file non inizia con test_: la normale esecuzione di pytest non lo raccoglie.
+
+import random
+from typing import Dict
+import pytest
+
+from config.run_config import RunConfig
+from src.algorithms.genetic_algorithm import GeneticAlgorithm
+from src.algorithms.population import Population
+from src.environment.environment import Environment
+from src.utils.a_star import astar_path, astar_path_temporal
+from src.utils.metrics import check_collisions, _check_collisions_loop, _check_collisions_sweep, calculate_fitness
+
+BENCH_SEED = 1234
+
+# (dimensione griglia, aerei, aeroporti)
+SCENARIOS = {
+    "g20-a50": (20, 50, 15),
+    "g50-a200": (50, 200, 25),
+    "g100-a1000": (100, 1000, 40),
+}
+
+_scenarios: Dict[str, "Scenario"] = {}
+
+
+class Scenario:
+    def __init__(self, grid_size: int, num_aircraft: int, num_airports: int):
+        self.run_config = RunConfig(
+            grid_size=grid_size,
+            num_aircraft=num_aircraft,
+            num_airports=num_airports,
+            max_simulation_time=max(200, 4 * grid_size),
+            population_size=20,
+            max_generations=1
+        )
+        random.seed(BENCH_SEED)
+        self.environment = Environment(run_config=self.run_config)
+        self.environment.route_table
+        
+        # Popolazione iniziale resa eterogenea da una mutazione dei tempi di partenza
+        self.ga = GeneticAlgorithm(self.environment, seed=BENCH_SEED, verbose=False)
+        self.ga.start()
+        for row in range(len(self.ga.population)):
+            self.ga.mutate_departure_time(self.ga.population, row)
+        self.ga.evaluate_population(self.ga.population)
+        self.solution = self.ga.get_solution(self.ga.population, 0)
+    
+    def new_ga(self) -> GeneticAlgorithm:
+        ga = GeneticAlgorithm(self.environment, seed=BENCH_SEED, verbose=False)
+        ga.start()
+        return ga
+
+
+@pytest.fixture(params=list(SCENARIOS), scope="module")
+def scenario(request) -> Scenario:
+    if request.param not in _scenarios:
+        _scenarios[request.param] = Scenario(*SCENARIOS[request.param])
+    return _scenarios[request.param]
+
+
+def test_check_collisions(bench, scenario):
+    result = bench(lambda: check_collisions(scenario.solution, scenario.run_config))
+    assert result == _check_collisions_loop(scenario.solution, scenario.run_config)
+
+
+def test_check_collisions_sweep(bench, scenario):
+    result = bench(lambda: _check_collisions_sweep(scenario.solution, scenario.run_config))
+    assert result == _check_collisions_loop(scenario.solution, scenario.run_config)
+
+
+def test_calculate_fitness(bench, scenario):
+    fitness = bench(lambda: calculate_fitness(scenario.solution, run_config=scenario.run_config))
+    assert fitness == scenario.ga.population.fitness[0]
+
+
+def test_astar_path(bench, scenario):
+    airports = scenario.environment.airports
+    pairs = [(airports[i].position, airports[(i + 1) % len(airports)].position) for i in range(len(airports))]
+    
+    def run():
+        return [astar_path(scenario.environment.grid, start, goal) for start, goal in pairs]
+    
+    paths = bench(run)
+    assert all(path is not None for path in paths)
+
+
+def test_astar_path_temporal(bench, scenario):
+    # Ripianifica i primi 10 aerei contro l'occupazione del resto della flotta
+    population = scenario.ga.population
+    context = scenario.ga.replan_context
+    aircraft_ids = list(range(10))
+    
+    def setup():
+        return (population.get_occupancy(0).copy(),)
+    
+    def run(occupancy):
+        routes = []
+        for aircraft_id in aircraft_ids:
+            departure, route = occupancy.trajectory(aircraft_id)
+            occupancy.release(aircraft_id)
+            routes.append(astar_path_temporal(
+                context.grid,
+                context.starts[aircraft_id],
+                context.destinations[aircraft_id],
+                departure,
+                occupancy,
+                heuristic_field=context.heuristic_fields[aircraft_id],
+                allow_wait=context.allow_wait,
+                max_time=context.horizon,
+                max_expansions=context.max_expansions
+            ))
+            occupancy.reserve(aircraft_id, departure, route)
+        return routes
+    
+    bench(run, setup=setup)
+
+
+def test_tournament_selection(bench, scenario):
+    ga = scenario.ga
+    
+    def run():
+        return [ga.tournament_selection() for _ in range(1000)]
+    
+    selected = bench(run)
+    assert all(0 <= row < len(ga.population) for row in selected)
+
+
+def test_single_point_crossover(bench, scenario):
+    ga = scenario.ga
+    num_pairs = 50
+    
+    def setup():
+        return (Population(2 * num_pairs, ga.population.num_aircraft, ga.route_pool, ga.grid,
+                           scenario.run_config.max_simulation_time),)
+    
+    def run(offspring):
+        size = len(ga.population)
+        for i in range(num_pairs):
+            ga.single_point_crossover(i % size, (i + 1) % size, offspring, 2 * i, 2 * i + 1)
+    
+    bench(run, setup=setup)
+
+
+def test_evolve_generation(bench, scenario):
+    def run(ga):
+        ga.step(1)
+        return ga
+    
+    ga = bench(run, setup=lambda: (scenario.new_ga(),), rounds=3)
+    assert len(ga.fitness_history) == 2
+
+
+def test_generate_environment_fast(bench):
+    # Scenario grande della modalità "fast", misurato end-to-end (griglia compresa)
+    run_config = RunConfig(
+        grid_size=500,
+        num_airports=3000,
+        min_airport_distance=5,
+        num_aircraft=30000,
+        generation_mode="fast"
+    )
+    
+    def run():
+        random.seed(BENCH_SEED)
+        return Environment(run_config=run_config)
+    
+    environment = bench(run, rounds=3)
+    assert len(environment.airports) == 3000 and len(environment.aircraft) == 30000
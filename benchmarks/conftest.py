@@ -0,0 +1,132 @@
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+from typing import Callable, Dict, List, Optional
+import pytest
+
+# Gli script del progetto si lanciano dalla radice del repository: stessa cosa per i benchmark
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+import numpy as np
+
+_results: List[Dict] = []
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("bench", "Benchmark dei percorsi critici")
+    group.addoption("--bench-json", default=None, metavar="PATH",
+                    help="Scrive i risultati dei benchmark in formato JSON")
+    group.addoption("--bench-compare", default=None, metavar="PATH",
+                    help="Confronta con un JSON di riferimento e segnala le regressioni")
+    group.addoption("--bench-threshold", type=float, default=0.25,
+                    help="Rallentamento relativo della mediana oltre il quale si segnala una regressione (default 0.25)")
+    group.addoption("--bench-rounds", type=int, default=5,
+                    help="Ripetizioni misurate per benchmark (default 5)")
+
+
+class Bench:
+    """Misura una funzione: una ripetizione di riscaldamento, poi `rounds` ripetizioni cronometrate."""
+    
+    def __init__(self, name: str, rounds: int):
+        self.name = name
+        self.rounds = rounds
+    
+    def __call__(self, function: Callable, setup: Optional[Callable] = None, rounds: Optional[int] = None):
+        # setup (non cronometrato) produce gli argomenti di ogni ripetizione
+        rounds = rounds or self.rounds
+        args = setup() if setup else ()
+        result = function(*args)
+        
+        timings = []
+        for _ in range(rounds):
+            args = setup() if setup else ()
+            start = time.perf_counter()
+            function(*args)
+            timings.append(time.perf_counter() - start)
+        
+        _results.append({
+            "name": self.name,
+            "rounds": rounds,
+            "min": min(timings),
+            "median": statistics.median(timings),
+            "mean": statistics.fmean(timings),
+            "max": max(timings)
+        })
+        return result
+
+
+@pytest.fixture
+def bench(request):
+    return Bench(request.node.nodeid.split("::", 1)[-1], request.config.getoption("--bench-rounds"))
+
+
+def _compare(results: List[Dict], baseline_path: str, threshold: float):
+    with open(baseline_path, "r") as f:
+        baseline = {entry["name"]: entry for entry in json.load(f)["benchmarks"]}
+    
+    report = []
+    for entry in results:
+        reference = baseline.get(entry["name"])
+        if reference is None:
+            continue
+        ratio = entry["median"] / reference["median"] if reference["median"] > 0 else float("inf")
+        report.append((entry["name"], reference["median"], entry["median"], ratio, ratio > 1 + threshold))
+    return report
+
+
+def pytest_sessionfinish(session, exitstatus):
+    config = session.config
+    if not _results:
+        return
+    
+    json_path = config.getoption("--bench-json")
+    if json_path:
+        directory = os.path.dirname(json_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(json_path, "w") as f:
+            json.dump({
+                "machine": {
+                    "python": platform.python_version(),
+                    "numpy": np.__version__,
+                    "platform": platform.platform(),
+                    "processor": platform.processor()
+                },
+                "benchmarks": _results
+            }, f, indent=2)
+    
+    baseline_path = config.getoption("--bench-compare")
+    if baseline_path:
+        config._bench_report = _compare(_results, baseline_path, config.getoption("--bench-threshold"))
+        if any(regressed for *_, regressed in config._bench_report):
+            session.exitstatus = pytest.ExitCode.TESTS_FAILED
+
+
+def pytest_terminal_summary(terminalreporter, exitstatus, config):
+    if not _results:
+        return
+    
+    terminalreporter.section("benchmark")
+    for entry in _results:
+        terminalreporter.write_line(
+            f"{entry['name']:<70} mediana {entry['median'] * 1000:10.3f} ms  min {entry['min'] * 1000:10.3f} ms"
+        )
+    
+    report = getattr(config, "_bench_report", None)
+    if report is None:
+        return
+    
+    terminalreporter.section("confronto con il riferimento")
+    regressions = 0
+    for name, reference, current, ratio, regressed in report:
+        marker = "REGRESSIONE" if regressed else "ok"
+        regressions += regressed
+        terminalreporter.write_line(
+            f"{name:<70} {reference * 1000:10.3f} -> {current * 1000:10.3f} ms  x{ratio:5.2f}  {marker}"
+        )
+    terminalreporter.write_line(f"{regressions} regressioni su {len(report)} benchmark confrontati")
@@ -2,6 +2,7 @@ GRID_SIZE = 20 # Dimensione della griglia
 
 NUM_AIRPORTS = 15 # Numero di aeroporti
 MIN_AIRPORT_DISTANCE = 4 # Distanza minima tra aeroporti
+GENERATION_MODE = "legacy" # Generazione dello scenario: "legacy" (rejection sampling) oppure "fast" (spatial hash + NumPy)
 
 NUM_AIRCRAFT = 50 # Numero di aerei
 MAX_SIMULATION_TIME = 200 # Tempo massimo
@@ -21,4 +22,15 @@ POPULATION_SIZE = 100  # Dimensione della popolazione
 MAX_GENERATIONS = 1000  # Numero massimo di generazioni
 TOURNAMENT_SIZE = 5  # Dimensione del torneo per la selezione
 MUTATION_RATE = 0.5  # Probabilità di mutazione del tempo di partenza
-CONVERGENCE_GENERATIONS = 50  # Generazioni con fitness invariato per convergenza
\ No newline at end of file
+CONVERGENCE_GENERATIONS = 50  # Generazioni con fitness invariato per convergenza
+FITNESS_CACHE_SIZE = 10000  # Valutazioni memorizzate nella cache LRU della fitness
+EVALUATION_WORKERS = 1  # Processi per la valutazione dei figli (1 = seriale)
+COLLISION_DETECTION = "vectorized"  # Rilevamento collisioni: "vectorized", "sweep" (solo aerei in volo) oppure "loop"
+
+NUM_ISLANDS = 4  # Modello a isole: numero di sottopopolazioni (processi)
+MIGRATION_INTERVAL = 10  # Modello a isole: generazioni tra due migrazioni
+MIGRATION_SIZE = 2  # Modello a isole: individui migliori inviati a ogni migrazione
+MIGRATION_TOPOLOGY = "ring"  # Modello a isole: "ring" oppure "random"
+
+TEMPORAL_ALLOW_WAIT = False  # A* spazio-temporale: consente l'attesa sul posto
+TEMPORAL_MAX_EXPANSIONS = 20000  # A* spazio-temporale: budget massimo di espansioni per ricerca
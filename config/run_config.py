@@ -0,0 +1,38 @@
+from dataclasses import dataclass, fields, replace
+import config.config as config
+
+
+@dataclass(frozen=True)
+class RunConfig:
+    """
+    Configurazione immutabile di una run. I valori del modulo config sono solo i default:
+    run con configurazioni diverse possono convivere nello stesso processo o in un pool.
+    Ogni campo corrisponde alla costante omonima (in maiuscolo) di config.config.
+    """
+    
+    grid_size: int = config.GRID_SIZE
+    num_airports: int = config.NUM_AIRPORTS
+    min_airport_distance: int = config.MIN_AIRPORT_DISTANCE
+    generation_mode: str = config.GENERATION_MODE
+    num_aircraft: int = config.NUM_AIRCRAFT
+    max_simulation_time: int = config.MAX_SIMULATION_TIME
+    
+    population_size: int = config.POPULATION_SIZE
+    max_generations: int = config.MAX_GENERATIONS
+    tournament_size: int = config.TOURNAMENT_SIZE
+    mutation_rate: float = config.MUTATION_RATE
+    convergence_generations: int = config.CONVERGENCE_GENERATIONS
+    fitness_cache_size: int = config.FITNESS_CACHE_SIZE
+    evaluation_workers: int = config.EVALUATION_WORKERS
+    collision_detection: str = config.COLLISION_DETECTION
+    
+    temporal_allow_wait: bool = config.TEMPORAL_ALLOW_WAIT
+    temporal_max_expansions: int = config.TEMPORAL_MAX_EXPANSIONS
+    
+    @classmethod
+    def from_module(cls) -> "RunConfig":
+        # Istantanea dei valori correnti del modulo config (anche se modificati a runtime)
+        return cls(**{field.name: getattr(config, field.name.upper()) for field in fields(cls)})
+    
+    def replace(self, **changes) -> "RunConfig":
+        return replace(self, **changes)
@@ -1,19 +1,22 @@
+import argparse
+import csv
 import itertools
 import json
 import os
 import random
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from datetime import datetime
 import numpy as np
 import matplotlib.pyplot as plt
 import seaborn as sns
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Set, Tuple
 import pandas as pd
 
 from src.algorithms.genetic_algorithm import GeneticAlgorithm
 from src.environment.environment import Environment
 from src.utils.metrics import get_solution_statistics
 from config.config import GRID_SIZE, NUM_AIRPORTS, NUM_AIRCRAFT
-import config.config as config
+from config.run_config import RunConfig
 
 PARAM_GRID = {
     'POPULATION_SIZE': [50, 100, 150],
@@ -28,73 +31,255 @@ for values in PARAM_GRID.values():
 
 RESULTS_DIR = "experiments/results"
 PLOTS_DIR = "experiments/plots"
+ROUTE_CACHE_DIR = "experiments/route_cache"  # Tabelle delle rotte riusate tra le combinazioni con lo stesso seed
+MAX_GENERATIONS = 1000  # Budget di generazioni di ogni run completa
+HALVING_MIN_GENERATIONS = 50  # Successive halving: budget del primo turno
+HALVING_ETA = 3  # Successive halving: a ogni turno sopravvive 1/ETA delle configurazioni, con budget x ETA
 os.makedirs(RESULTS_DIR, exist_ok=True)
 os.makedirs(PLOTS_DIR, exist_ok=True)
 
-def run_grid_search(seed: int = 43636543) -> pd.DataFrame:
+# Colonne del CSV dei risultati, fisse perché le righe vengono aggiunte una alla volta
+RESULT_COLUMNS = list(PARAM_GRID.keys()) + [
+    'seed', 'max_generations', 'completion_time', 'avg_departure_delay', 'best_fitness', 'generations',
+    'num_collisions', 'cache_hits', 'cache_misses', 'error'
+]
+
+def run_combination(params: Dict, seed: int, max_generations: int = MAX_GENERATIONS,
+                    scenario_path: Optional[str] = None) -> Dict:
+    # Esegue una singola combinazione con una RunConfig propria: il modulo config non viene
+    # modificato, quindi più combinazioni possono girare in parallelo senza interferire.
+    # Con scenario_path l'ambiente viene caricato dal file di scenario invece che rigenerato.
+    try:
+        random.seed(seed)
+        run_config = RunConfig.from_module().replace(
+            population_size=params['POPULATION_SIZE'],
+            max_generations=max_generations,
+            tournament_size=params['TOURNAMENT_SIZE'],
+            mutation_rate=params['MUTATION_RATE'],
+            convergence_generations=params['CONVERGENCE_GENERATIONS']
+        )
+        
+        if scenario_path is not None:
+            env = Environment(run_config=run_config, scenario_path=scenario_path)
+        else:
+            env = Environment(route_cache_dir=ROUTE_CACHE_DIR, run_config=run_config)
+        
+        ga = GeneticAlgorithm(env, seed=seed, save_snapshots=False, verbose=False)
+        best_solution, fitness_history = ga.evolve()
+        
+        final_stats = get_solution_statistics(best_solution, run_config)
+        
+        result = {
+            **params,
+            'seed': seed,
+            'max_generations': max_generations,
+            'completion_time': final_stats['completion_time'],
+            'avg_departure_delay': final_stats['avg_departure_delay'],
+            'best_fitness': ga.best_fitness,
+            'generations': len(fitness_history),
+            'num_collisions': final_stats['num_collisions'],
+            'cache_hits': ga.fitness_cache.hits,
+            'cache_misses': ga.fitness_cache.misses
+        }
+        print(f"  OK {params} - Fitness: {ga.best_fitness:.2f}, Generazioni: {len(fitness_history)}, "
+              f"Collisioni: {final_stats['num_collisions']}, Cache hit: {ga.fitness_cache.hit_rate:.1%}")
+        return result
+    
+    except Exception as e:
+        print(f"  ERRORE {params}: {e}")
+        import traceback
+        traceback.print_exc()
+        return {
+            **params,
+            'seed': seed,
+            'max_generations': max_generations,
+            'completion_time': -1,
+            'avg_departure_delay': -1,
+            'best_fitness': -999999,
+            'generations': -1,
+            'num_collisions': 999,
+            'cache_hits': 0,
+            'cache_misses': 0,
+            'error': str(e)
+        }
+
+def has_result_schema(csv_file: str) -> bool:
+    # True se l'intestazione del CSV coincide con RESULT_COLUMNS (i CSV storici hanno meno colonne)
+    with open(csv_file, newline='') as f:
+        return next(csv.reader(f), None) == RESULT_COLUMNS
+
+def append_result(csv_file: str, result: Dict):
+    # Aggiunge una riga e la porta su disco subito: un'interruzione non perde le combinazioni finite
+    write_header = not os.path.exists(csv_file) or os.path.getsize(csv_file) == 0
+    if not write_header and not has_result_schema(csv_file):
+        raise ValueError(f"{csv_file} ha colonne diverse da RESULT_COLUMNS: nessuna riga aggiunta")
+    with open(csv_file, 'a', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=RESULT_COLUMNS)
+        if write_header:
+            writer.writeheader()
+        writer.writerow({column: result.get(column, '') for column in RESULT_COLUMNS})
+        f.flush()
+        os.fsync(f.fileno())
+
+def load_completed(csv_file: str, seed: int) -> Set[Tuple]:
+    # Chiavi (parametri..., max_generations) delle run già concluse senza errori per questo seed:
+    # una run a budget ridotto non vale come run completa
+    if not os.path.exists(csv_file) or os.path.getsize(csv_file) == 0:
+        return set()
+    df = pd.read_csv(csv_file)
+    done = df[(df['seed'] == seed) & df['error'].isna()]
+    return set(done[list(PARAM_GRID.keys()) + ['max_generations']].itertuples(index=False, name=None))
+
+def latest_results_file() -> Optional[str]:
+    # Solo i CSV con lo schema attuale si possono riprendere
+    csv_files = [os.path.join(RESULTS_DIR, name) for name in os.listdir(RESULTS_DIR)
+                 if name.startswith("grid_search_results_") and name.endswith(".csv")]
+    csv_files = [csv_file for csv_file in csv_files
+                 if os.path.getsize(csv_file) > 0 and has_result_schema(csv_file)]
+    return max(csv_files, key=os.path.getmtime) if csv_files else None
+
+def finalize_results(csv_file: str, combinations: List[Dict]) -> pd.DataFrame:
+    # Riscrive il CSV nell'ordine delle combinazioni; un tentativo fallito viene sostituito
+    # da quello riuscito in una ripresa successiva
+    param_names = list(PARAM_GRID.keys())
+    order = {tuple(params[name] for name in param_names): idx for idx, params in enumerate(combinations)}
+    
+    df = pd.read_csv(csv_file)
+    df['_failed'] = df['error'].notna()
+    df['_order'] = [order.get(key, len(order)) for key in df[param_names].itertuples(index=False, name=None)]
+    df = df.sort_values(['seed', 'max_generations', '_order', '_failed'], kind='stable')
+    df = df.drop_duplicates(subset=['seed', 'max_generations'] + param_names, keep='first')
+    df = df.drop(columns=['_failed', '_order']).reset_index(drop=True)
+    
+    temp_file = f"{csv_file}.tmp"
+    df.to_csv(temp_file, index=False)
+    os.replace(temp_file, csv_file)
+    return df
+
+def run_grid_search(seed: int = 43636543, workers: int = 1, resume_file: Optional[str] = None,
+                    scenario_path: Optional[str] = None) -> pd.DataFrame:
     # Genera tutte le combinazioni
     param_names = list(PARAM_GRID.keys())
     param_values = list(PARAM_GRID.values())
-    all_combinations = list(itertools.product(*param_values))
+    all_combinations = [dict(zip(param_names, combination)) for combination in itertools.product(*param_values)]
     
-    results = []
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    checkpoint_file = f"{RESULTS_DIR}/checkpoint_{timestamp}.json"
+    if resume_file is not None and os.path.exists(resume_file) and os.path.getsize(resume_file) > 0 \
+            and not has_result_schema(resume_file):
+        # Mai aggiungere righe a un CSV con un altro schema: la ricerca riparte su un file nuovo
+        print(f"{resume_file} ha colonne diverse da quelle attuali e non può essere ripreso: avvio di una nuova ricerca")
+        resume_file = None
+    
+    if resume_file is not None:
+        csv_file = resume_file
+    else:
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        csv_file = f"{RESULTS_DIR}/grid_search_results_{timestamp}.csv"
+    
+    completed = load_completed(csv_file, seed)
+    pending = [params for params in all_combinations
+               if tuple(params[name] for name in param_names) + (MAX_GENERATIONS,) not in completed]
+    
+    print(f"Avvio Grid Search... (seed={seed}, worker={workers})")
+    print(f"Risultati salvati progressivamente in: {csv_file}")
+    if completed:
+        print(f"Ripresa: {total_combinations - len(pending)}/{total_combinations} combinazioni già completate")
+    print()
+    
+    # Le tabelle delle rotte vengono calcolate una volta prima di avviare i worker,
+    # così nessun processo le ricalcola o le scrive in concorrenza
+    if pending and scenario_path is None:
+        random.seed(seed)
+        Environment(route_cache_dir=ROUTE_CACHE_DIR).route_table
+    
+    done = total_combinations - len(pending)
+    if workers <= 1:
+        for params in pending:
+            done += 1
+            print(f"[{done}/{total_combinations}] Testing: {params}")
+            append_result(csv_file, run_combination(params, seed, MAX_GENERATIONS, scenario_path))
+    else:
+        # Ogni risultato viene scritto appena disponibile; l'ordine finale lo ristabilisce finalize_results
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(run_combination, params, seed, MAX_GENERATIONS, scenario_path) for params in pending]
+            for future in as_completed(futures):
+                done += 1
+                append_result(csv_file, future.result())
+                print(f"[{done}/{total_combinations}] Completato")
+    
+    df = finalize_results(csv_file, all_combinations)
+    df = df[(df['seed'] == seed) & (df['max_generations'] == MAX_GENERATIONS)].reset_index(drop=True)
+    print(f"\nGrid Search completato!")
+    print(f"Risultati salvati in: {csv_file}")
     
-    print(f"Avvio Grid Search... (seed={seed})")
-    print(f"Checkpoint salvati in: {checkpoint_file}\n")
+    return df
+
+def run_successive_halving(
+    seed: int = 43636543,
+    workers: int = 1,
+    min_generations: int = HALVING_MIN_GENERATIONS,
+    eta: int = HALVING_ETA,
+    max_generations: int = MAX_GENERATIONS,
+    scenario_path: Optional[str] = None) -> pd.DataFrame:
+    # Tutte le combinazioni partono con un budget ridotto; a ogni turno solo la frazione 1/eta
+    # migliore viene promossa con un budget eta volte più grande, fino a max_generations.
+    # Il CSV ha lo stesso schema del grid search: una riga per combinazione, relativa
+    # all'ultimo budget raggiunto (colonna max_generations).
+    param_names = list(PARAM_GRID.keys())
+    param_values = list(PARAM_GRID.values())
+    all_combinations = [dict(zip(param_names, combination)) for combination in itertools.product(*param_values)]
     
-    for idx, combination in enumerate(all_combinations, 1):
-        params = dict(zip(param_names, combination))
-        
-        print(f"[{idx}/{total_combinations}] Testing: {params}")
-        
-        try:
-            random.seed(seed)
-            config.POPULATION_SIZE = params['POPULATION_SIZE']
-            config.MAX_GENERATIONS = 1000
-            config.TOURNAMENT_SIZE = params['TOURNAMENT_SIZE']
-            config.MUTATION_RATE = params['MUTATION_RATE']
-            config.CONVERGENCE_GENERATIONS = params['CONVERGENCE_GENERATIONS']
-            
-            env = Environment()
-            
-            ga = GeneticAlgorithm(env, seed=seed, save_snapshots=False)
-            best_solution, fitness_history = ga.evolve()
-            
-            final_stats = get_solution_statistics(best_solution)
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    # Prefisso diverso dal grid search: questi CSV non vengono presi da --resume (regenerate_plots li elenca)
+    csv_file = f"{RESULTS_DIR}/halving_results_{timestamp}.csv"
+    
+    print(f"Avvio Successive Halving... (seed={seed}, worker={workers}, eta={eta}, "
+          f"budget {min_generations} -> {max_generations} generazioni)")
+    
+    if scenario_path is None:
+        random.seed(seed)
+        Environment(route_cache_dir=ROUTE_CACHE_DIR).route_table
+    
+    latest: Dict[int, Dict] = {}  # indice combinazione -> risultato all'ultimo budget
+    survivors = list(range(len(all_combinations)))
+    budget = min(min_generations, max_generations)
+    executor = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+    try:
+        rung = 0
+        while True:
+            # Una run terminata per convergenza prima del budget darebbe lo stesso risultato: non si ripete
+            to_run = [idx for idx in survivors
+                      if idx not in latest or latest[idx]['generations'] > latest[idx]['max_generations']]
+            tasks = [all_combinations[idx] for idx in to_run]
+            if executor is None:
+                results = [run_combination(params, seed, budget, scenario_path) for params in tasks]
+            else:
+                results = list(executor.map(run_combination, tasks, itertools.repeat(seed), itertools.repeat(budget),
+                                            itertools.repeat(scenario_path)))
+            for idx in survivors:
+                if idx in latest:
+                    latest[idx] = {**latest[idx], 'max_generations': budget}
+            for idx, result in zip(to_run, results):
+                latest[idx] = result
             
-            result = {
-                **params,
-                'completion_time': final_stats['completion_time'],
-                'avg_departure_delay': final_stats['avg_departure_delay'],
-                'best_fitness': ga.best_fitness,
-                'generations': len(fitness_history),
-                'num_collisions': final_stats['num_collisions']
-            }
+            best = max(latest[idx]['best_fitness'] for idx in survivors)
+            print(f"Turno {rung}: {len(survivors)} configurazioni, budget {budget} generazioni, "
+                  f"{len(to_run)} run eseguite, best fitness {best:.2f}")
             
-            results.append(result)
-            print(f"  OK - Fitness: {ga.best_fitness:.2f}, Generazioni: {len(fitness_history)}, Collisioni: {final_stats['num_collisions']}")
+            if budget >= max_generations:
+                break
             
-        except Exception as e:
-            print(f"  ERRORE: {e}")
-            import traceback
-            traceback.print_exc()
-            result = {
-                **params,
-                'completion_time': -1,
-                'avg_departure_delay': -1,
-                'best_fitness': -999999,
-                'generations': -1,
-                'num_collisions': 999,
-                'error': str(e)
-            }
-            results.append(result)
-    
-    df = pd.DataFrame(results)
-    csv_file = f"{RESULTS_DIR}/grid_search_results_{timestamp}.csv"
+            # Promozione: ordinamento stabile, a parità di fitness vince la combinazione precedente
+            keep = max(1, len(survivors) // eta)
+            survivors = sorted(survivors, key=lambda idx: -latest[idx]['best_fitness'])[:keep]
+            budget = min(budget * eta, max_generations)
+            rung += 1
+    finally:
+        if executor is not None:
+            executor.shutdown()
+    
+    df = pd.DataFrame([latest[idx] for idx in sorted(latest)], columns=RESULT_COLUMNS)
     df.to_csv(csv_file, index=False)
-    print(f"\nGrid Search completato!")
+    print(f"\nSuccessive Halving completato!")
     print(f"Risultati salvati in: {csv_file}")
     
     return df
@@ -299,19 +484,65 @@ def print_summary_statistics(df: pd.DataFrame):
 # ==========================
 if __name__ == "__main__":
     import time
+    
+    parser = argparse.ArgumentParser(description="Grid search dei parametri del GA")
+    parser.add_argument("--mode", choices=["grid", "halving"], default="grid",
+                        help="grid: tutte le combinazioni a budget pieno; halving: successive halving")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="Processi paralleli per le combinazioni (default: numero di core)")
+    parser.add_argument("--seed", type=int, default=None, help="Seed della ricerca (se assente viene chiesto)")
+    parser.add_argument("--resume", nargs="?", const="latest", default=None, metavar="CSV",
+                        help="Riprende una ricerca interrotta (default: il CSV più recente), "
+                             "saltando le combinazioni già completate per lo stesso seed")
+    parser.add_argument("--scenario", default=None, metavar="PATH",
+                        help="File di scenario binario condiviso da tutte le combinazioni "
+                             "(se non esiste viene creato dal seed della ricerca)")
+    args = parser.parse_args()
+    
+    resume_file = None
+    if args.resume is not None:
+        resume_file = latest_results_file() if args.resume == "latest" else args.resume
+        if resume_file is None:
+            print("Nessun risultato da riprendere: avvio di una nuova ricerca")
+    
     start_time = time.time()
     
-    print(f"ATTENZIONE: Questo grid search richiedera' ~{total_combinations * 30 / 3600:.1f} ore!")
+    if args.mode == "grid":
+        estimated_runs = total_combinations
+    else:
+        # Run complete equivalenti: somma dei budget dei turni, in unità di MAX_GENERATIONS
+        estimated_runs, survivors, budget = 0.0, total_combinations, HALVING_MIN_GENERATIONS
+        while True:
+            estimated_runs += survivors * budget / MAX_GENERATIONS
+            if budget >= MAX_GENERATIONS:
+                break
+            survivors, budget = max(1, survivors // HALVING_ETA), min(budget * HALVING_ETA, MAX_GENERATIONS)
+    print(f"ATTENZIONE: Questa ricerca richiedera' al massimo ~{estimated_runs * 30 / 3600 / args.workers:.1f} ore "
+          f"con {args.workers} worker!")
     response = input("Continuare? (y/n): ")
     
     if response.lower() != 'y':
         print("Grid search annullato")
         exit()
     
-    seed_input = input("Inserisci seed (default=42): ").strip()
-    search_seed = int(seed_input) if seed_input else 42
+    if args.seed is None:
+        seed_input = input("Inserisci seed (default=42): ").strip()
+        search_seed = int(seed_input) if seed_input else 42
+    else:
+        search_seed = args.seed
+    
+    if args.scenario is not None and not os.path.exists(args.scenario):
+        random.seed(search_seed)
+        Environment().save_scenario(args.scenario, distance_fields=True)
+        print(f"Scenario salvato in: {args.scenario}")
     
-    results_df = run_grid_search(seed=search_seed)
+    if args.mode == "halving":
+        if resume_file is not None:
+            print("--resume non è supportato in modalità halving: la ricerca riparte da zero")
+        results_df = run_successive_halving(seed=search_seed, workers=args.workers, scenario_path=args.scenario)
+    else:
+        results_df = run_grid_search(seed=search_seed, workers=args.workers, resume_file=resume_file,
+                                     scenario_path=args.scenario)
     
     print("\nGenerazione grafici...")
     plot_parameter_importance(results_df)
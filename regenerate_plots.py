@@ -17,7 +17,9 @@ from parameter_tuning import (
 
 
 def list_available_csvs():
+    # Risultati del grid search e del successive halving (stesso schema)
     csv_files = list(Path(RESULTS_DIR).glob("grid_search_results_*.csv"))
+    csv_files += Path(RESULTS_DIR).glob("halving_results_*.csv")
     return sorted(csv_files, key=lambda x: x.stat().st_mtime, reverse=True)
 
 
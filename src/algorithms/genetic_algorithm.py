@@ -1,195 +1,369 @@
 import random
-import copy
-from typing import List, Tuple, Dict
+from typing import List, Tuple, Dict, Optional
+import numpy as np
 from src.environment.environment import Environment
 from src.environment.aircraft import Aircraft
-from src.environment.grid import Grid
-from src.utils.a_star import astar_path, astar_path_temporal
-from src.utils.metrics import calculate_fitness, check_collisions
-import config.config as config
+from src.algorithms.population import Population, RoutePool
+from src.algorithms.parallel_evaluation import ReplanContext, ParallelEvaluator, replan_colliding_aircraft
+from src.utils.fitness_cache import FitnessCache
+from src.utils.instrumentation import NULL_INSTRUMENTATION
+from src.utils.a_star import AStarStats, AStarStatsAggregate
+from config.run_config import RunConfig
 
 
 class GeneticAlgorithm:
-    def __init__(self, environment: Environment, seed: int = None, save_snapshots: bool = False, snapshot_interval: int = 5):
+    def __init__(self, environment: Environment, seed: int = None, save_snapshots: bool = False, snapshot_interval: int = 5,
+                 fitness_cache_size: Optional[int] = None, workers: Optional[int] = None,
+                 chunk_size: Optional[int] = None, population_size: Optional[int] = None, verbose: bool = True,
+                 run_config: Optional[RunConfig] = None, instrumentation=None, collect_astar_stats: bool = False,
+                 snapshot_sink=None):
+        # Senza run_config si usa quella dell'ambiente; gli altri argomenti opzionali la sovrascrivono
         if seed is not None:
             random.seed(seed)
         
         self.environment = environment
+        self.config = run_config or environment.config
         self.grid = environment.grid
-        self.population: List[List[Aircraft]] = []
+        self.route_pool = RoutePool()
+        self.population_size = self.config.population_size if population_size is None else population_size
+        self.verbose = verbose
+        self.population: Population = None
         self.best_solution: List[Aircraft] = None
         self.best_fitness: float = float('-inf')
         self.fitness_history: List[float] = []
         self.save_snapshots = save_snapshots
         self.snapshot_interval = snapshot_interval
         self.snapshots: Dict[int, List[Aircraft]] = {}  # {generation: best_solution}
+        # Se impostato (es. SnapshotLog) snapshot e fitness vengono scritti man mano invece di restare in self.snapshots
+        self.snapshot_sink = snapshot_sink
+        self._last_snapshot_generation: Optional[int] = None
+        if fitness_cache_size is None:
+            fitness_cache_size = self.config.fitness_cache_size
+        self.fitness_cache = FitnessCache(fitness_cache_size)  # Condivisa tra le generazioni della run
+        # > 1: figli ripianificati e valutati in un pool di processi
+        self.workers = self.config.evaluation_workers if workers is None else workers
+        self.chunk_size = chunk_size
+        self.replan_context: Optional[ReplanContext] = None
+        self._evaluator: Optional[ParallelEvaluator] = None
+        self._generations_without_improvement = 0
+        self._previous_best_fitness = float('-inf')
+        # GenerationInstrumentation per tempi per fase e contatori; di default nessun costo
+        self.instrumentation = instrumentation or NULL_INSTRUMENTATION
+        # Statistiche delle ricerche A* di ripianificazione, complessive e per aereo
+        self.astar_stats: Optional[AStarStatsAggregate] = AStarStatsAggregate() if collect_astar_stats else None
+    
+    def log(self, message: str):
+        if self.verbose:
+            print(message)
+    
+    @property
+    def num_evaluations(self) -> int:
+        # Valutazioni effettive (escluse quelle servite dalle cache)
+        return self.fitness_cache.misses
     
     def initialize_population(self):
-        print("Inizializzazione popolazione...")
-        
-        for _ in range(config.POPULATION_SIZE):
-            individual = [
-                Aircraft(
-                    aircraft.id,
-                    aircraft.start_airport_id,
-                    aircraft.destination_airport_id,
-                    aircraft.start_position,
-                    aircraft.destination_position
-                )
-                for aircraft in self.environment.aircraft
-            ]
-            
-            aircraft_by_airport = {}
-            for aircraft in individual:
-                if aircraft.start_airport_id not in aircraft_by_airport:
-                    aircraft_by_airport[aircraft.start_airport_id] = []
-                aircraft_by_airport[aircraft.start_airport_id].append(aircraft)
+        self.log("Inizializzazione popolazione...")
+        
+        num_aircraft = len(self.environment.aircraft)
+        self.population = Population(self.population_size, num_aircraft, self.route_pool, self.grid,
+                                     self.config.max_simulation_time)
+        route_table = self.environment.route_table
         
-            for airport_id, aircraft_list in aircraft_by_airport.items():
-                for i, aircraft in enumerate(aircraft_list):
-                    route = astar_path(self.grid, aircraft.start_position, aircraft.destination_position)
-                    if route is None:
-                        raise ValueError(f"Impossibile trovare percorso per aereo {aircraft.id}")
-                    aircraft.set_route(route)
-                    aircraft.set_departure_time(i)
+        # Tutti gli individui partono dallo stesso genoma: rotte dalla tabella, partenze scaglionate per aeroporto
+        aircraft_by_airport = {}
+        for aircraft in self.environment.aircraft:
+            if aircraft.start_airport_id not in aircraft_by_airport:
+                aircraft_by_airport[aircraft.start_airport_id] = []
+            aircraft_by_airport[aircraft.start_airport_id].append(aircraft)
         
-            self.population.append(individual)
+        for airport_id, aircraft_list in aircraft_by_airport.items():
+            for i, aircraft in enumerate(aircraft_list):
+                try:
+                    route = route_table.route(aircraft.start_airport_id, aircraft.destination_airport_id)
+                except ValueError:
+                    raise ValueError(f"Impossibile trovare percorso per aereo {aircraft.id}")
+                self.population.route_ids[:, aircraft.id] = self.route_pool.intern(route)
+                self.population.departures[:, aircraft.id] = i
         
-        print(f"Popolazione iniziale creata: {config.POPULATION_SIZE} individui")
+        self.log(f"Popolazione iniziale creata: {self.population_size} individui")
+    
+    def evaluate(self, population: Population, row: int, keep_occupancy: bool = False) -> float:
+        # Ricalcola solo se un operatore ha modificato l'individuo. Una volta valutata la riga la sua
+        # tabella di occupazione viene scartata (keep_occupancy=True se sta per essere ripianificata)
+        if population.is_dirty(row):
+            fitness, num_collisions = self.fitness_cache.get_score(
+                population.key(row),
+                compute=lambda: population.get_occupancy(row).score()
+            )
+            population.num_collisions[row] = num_collisions
+            population.fitness[row] = fitness
+        if not keep_occupancy:
+            population.occupancy[row] = None
+        return float(population.fitness[row])
+    
+    def evaluate_population(self, population: Population) -> np.ndarray:
+        for row in range(len(population)):
+            self.evaluate(population, row)
+        return population.fitness
     
-    def tournament_selection(self) -> List[Aircraft]:
-        tournament = random.sample(self.population, config.TOURNAMENT_SIZE)
-        winner = max(tournament, key=lambda ind: calculate_fitness(ind))
-        return copy.deepcopy(winner)
+    def get_solution(self, population: Population, row: int) -> List[Aircraft]:
+        return population.to_aircraft(row, self.environment.aircraft)
+    
+    def tournament_selection(self) -> int:
+        tournament = random.sample(range(len(self.population)), self.config.tournament_size)
+        fitness = self.population.fitness
+        return max(tournament, key=lambda row: fitness[row])
     
     def single_point_crossover(
         self,
-        parent1: List[Aircraft],
-        parent2: List[Aircraft]):
-        child1 = copy.deepcopy(parent1)
-        child2 = copy.deepcopy(parent2)
+        parent1: int,
+        parent2: int,
+        offspring: Population,
+        row1: int,
+        row2: int):
+        # I figli vengono scritti nelle righe row1 e row2 di offspring
+        # Le tabelle di occupazione dei figli non vengono copiate: si ricostruiscono alla valutazione
+        offspring.copy_row(self.population, parent1, row1)
+        offspring.copy_row(self.population, parent2, row2)
         
-        if len(child1) <= 1:
-            return child1, child2
+        num_aircraft = offspring.num_aircraft
+        if num_aircraft <= 1:
+            return
         
-        crossover_point = random.randint(1, len(child1) - 1)
+        crossover_point = random.randint(1, num_aircraft - 1)
         
-        for i in range(crossover_point, len(child1)):
-            child1[i].route, child2[i].route = child2[i].route[:], child1[i].route[:]
-            child1[i].departure_time, child2[i].departure_time = (
-                child2[i].departure_time,
-                child1[i].departure_time
-            )
+        # Scambio della coda: i figli vanno rivalutati solo se almeno un gene è diverso
+        departures1 = self.population.departures[parent1, crossover_point:]
+        departures2 = self.population.departures[parent2, crossover_point:]
+        routes1 = self.population.route_ids[parent1, crossover_point:]
+        routes2 = self.population.route_ids[parent2, crossover_point:]
+        differing = np.flatnonzero((departures1 != departures2) | (routes1 != routes2))
+        if len(differing) == 0:
+            return
+        
+        offspring.departures[row1, crossover_point:] = departures2
+        offspring.departures[row2, crossover_point:] = departures1
+        offspring.route_ids[row1, crossover_point:] = routes2
+        offspring.route_ids[row2, crossover_point:] = routes1
         
-        return child1, child2
+        offspring.invalidate(row1)
+        offspring.invalidate(row2)
     
-    def mutate_departure_time(self, individual: List[Aircraft]):
-        for aircraft in individual:
-            if random.random() < config.MUTATION_RATE:
-                max_delay = config.MAX_SIMULATION_TIME // 4  # Ritardo massimo ragionevole
-                aircraft.set_departure_time(random.randint(0, max_delay))
+    def mutate_departure_time(self, population: Population, row: int):
+        for i in range(population.num_aircraft):
+            if random.random() < self.config.mutation_rate:
+                max_delay = self.config.max_simulation_time // 4  # Ritardo massimo ragionevole
+                population.set_departure_time(row, i, random.randint(0, max_delay))
     
-    def mutate_with_astar_deviation(self, individual: List[Aircraft], grid: Grid):
-        num_collisions, collisions_detail = check_collisions(individual)
+    def mutate_with_astar_deviation(self, population: Population, row: int, choice: Optional[float] = None):
+        # choice in [0, 1) sceglie l'aereo in collisione da ripianificare; viene estratto in evolve
+        # prima della valutazione, così la modalità seriale e quella parallela coincidono
+        if choice is None:
+            choice = random.random()
         
-        if num_collisions == 0:
+        # Le valutazioni dei figli avvengono qui: vengono contate anche nella fase "evaluation"
+        with self.instrumentation.phase("evaluation"):
+            self.evaluate(population, row, keep_occupancy=True)
+        if population.num_collisions[row] == 0:
+            population.occupancy[row] = None
             return
         
-        aircraft_with_collisions = set()
-        for _, aid1, aid2 in collisions_detail:
-            aircraft_with_collisions.add(aid1)
-            aircraft_with_collisions.add(aid2)
+        occupancy = population.get_occupancy(row)
+        stats = AStarStats() if self.astar_stats is not None else None
+        with self.instrumentation.phase("astar"):
+            aircraft_id, new_route = replan_colliding_aircraft(occupancy, choice, self.replan_context, stats)
+        if aircraft_id is not None:
+            self._record_astar(aircraft_id, stats)
         
-        if aircraft_with_collisions:
-            aircraft_id = random.choice(list(aircraft_with_collisions))
-            aircraft = individual[aircraft_id]
-
-            occupied_cells = {}
-            for other in individual:
-                if other.id != aircraft.id and len(other.route) > 0:
-                    for t_idx, pos in enumerate(other.route):
-                        time_step = other.departure_time + t_idx
-                        key = (pos[0], pos[1], time_step)
-                        occupied_cells[key] = other.id
-
-            new_route = astar_path_temporal(
-                grid,
-                aircraft.start_position,
-                aircraft.destination_position,
-                aircraft.departure_time,
-                occupied_cells
-            )
-            
+        if new_route is not None:
+            population.set_route(row, aircraft_id, self.route_pool.intern(new_route))
+        with self.instrumentation.phase("evaluation"):
+            self.evaluate(population, row)
+    
+    def _record_astar(self, aircraft_id: int, stats: Optional[AStarStats]):
+        self.instrumentation.count("astar_calls")
+        if stats is not None and self.astar_stats is not None:
+            self.astar_stats.add(stats, aircraft_id)
+            self.instrumentation.count("astar_expanded", stats.expanded)
+    
+    def develop_offspring(self, population: Population, pending: List[Tuple[int, float]]):
+        # Ripianificazione A* e valutazione dei figli (righe, choice)
+        if self._evaluator is None:
+            for row, choice in pending:
+                self.mutate_with_astar_deviation(population, row, choice)
+            return
+        
+        # Gli individui già noti e senza collisioni non richiedono lavoro ai worker
+        tasks = []
+        for row, choice in pending:
+            score = self.fitness_cache.lookup(population.key(row))
+            if score is not None and score[1] == 0:
+                population.num_collisions[row] = 0
+                population.fitness[row] = score[0]
+            else:
+                tasks.append((row, choice))
+        
+        results = self._evaluator.develop(population, tasks)
+        for (row, _), (aircraft_id, new_route, worker_score, astar_stats) in zip(tasks, results):
+            if aircraft_id is not None:
+                self._record_astar(aircraft_id, astar_stats)
             if new_route is not None:
-                aircraft.set_route(new_route)
+                population.set_route(row, aircraft_id, self.route_pool.intern(new_route))
+            fitness, num_collisions = self.fitness_cache.get_score(population.key(row), compute=lambda: worker_score)
+            population.num_collisions[row] = num_collisions
+            population.fitness[row] = fitness
     
-    def evolve(self):
-        self.initialize_population()
+    def emigrants(self, count: int) -> Dict[str, object]:
+        # Migliori individui in forma indipendente dal RoutePool locale, da inviare a un'altra isola
+        rows = np.argsort(-self.population.fitness, kind='stable')[:count]
+        route_ids = self.population.route_ids[rows]
+        return {
+            'departures': self.population.departures[rows].copy(),
+            'route_ids': route_ids.copy(),
+            'routes': {route_id: self.route_pool[route_id] for route_id in np.unique(route_ids).tolist()},
+            'fitness': self.population.fitness[rows].copy(),
+            'num_collisions': self.population.num_collisions[rows].copy()
+        }
+    
+    def immigrate(self, migrants: Dict[str, object]):
+        # Gli immigrati sostituiscono i peggiori individui; la fitness arriva già calcolata
+        count = min(len(migrants['fitness']), len(self.population))
+        worst = np.argsort(self.population.fitness, kind='stable')[:count]
+        local_ids = {route_id: self.route_pool.intern(route) for route_id, route in migrants['routes'].items()}
+        for i, row in enumerate(worst.tolist()):
+            self.population.departures[row] = migrants['departures'][i]
+            self.population.route_ids[row] = [local_ids[route_id] for route_id in migrants['route_ids'][i].tolist()]
+            self.population.fitness[row] = migrants['fitness'][i]
+            self.population.num_collisions[row] = migrants['num_collisions'][i]
+            self.population.occupancy[row] = None
+    
+    def _record_fitness(self, generation: int, fitness: float):
+        self.fitness_history.append(fitness)
+        if self.snapshot_sink is not None:
+            self.snapshot_sink.write_fitness(generation, fitness)
+    
+    def _record_snapshot(self, generation: int, solution: List[Aircraft]):
+        self._last_snapshot_generation = generation
+        if self.snapshot_sink is not None:
+            self.snapshot_sink.write_snapshot(generation, solution)
+        else:
+            self.snapshots[generation] = solution
+    
+    def start(self):
+        # Popolazione iniziale e generazione 0; le generazioni successive si eseguono con step()
+        instrumentation = self.instrumentation
+        instrumentation.begin_generation(0)
+        
+        with instrumentation.phase("initialization"):
+            self.initialize_population()
+            self.replan_context = ReplanContext(self.grid, self.environment.aircraft, self.environment.route_table, self.config)
+            self.replan_context.collect_stats = self.astar_stats is not None
+            if self.workers > 1:
+                self._evaluator = ParallelEvaluator(self.replan_context, self.workers, self.chunk_size)
         
-        best_fitness_in_generation = max(calculate_fitness(ind) for ind in self.population)
-        self.fitness_history.append(best_fitness_in_generation)
+        with instrumentation.phase("evaluation"):
+            fitness = self.evaluate_population(self.population)
+        best_fitness_in_generation = float(fitness.max())
+        self._record_fitness(0, best_fitness_in_generation)
         
         if self.save_snapshots:
-            best_ind = max(self.population, key=lambda ind: calculate_fitness(ind))
-            self.snapshots[0] = copy.deepcopy(best_ind)
+            self._record_snapshot(0, self.get_solution(self.population, int(np.argmax(fitness))))
         
-        generations_without_improvement = 0
-        previous_best_fitness = best_fitness_in_generation
+        self._generations_without_improvement = 0
+        self._previous_best_fitness = best_fitness_in_generation
         
-        print(f"\nGen 0: Best Fitness = {best_fitness_in_generation:.2f}")
+        instrumentation.end_generation(0, best_fitness_in_generation, self.fitness_cache)
+        self.log(f"\nGen 0: Best Fitness = {best_fitness_in_generation:.2f}")
+    
+    def step(self, generation: int) -> bool:
+        # Esegue una generazione; ritorna True se il criterio di convergenza è soddisfatto
+        instrumentation = self.instrumentation
+        instrumentation.begin_generation(generation)
         
-        for generation in range(1, config.MAX_GENERATIONS+1):
-            new_population = []
-
-            elite_size = max(1, config.POPULATION_SIZE // 10)
-            elite = sorted(self.population, key=lambda ind: calculate_fitness(ind), reverse=True)[:elite_size]
-            new_population.extend([copy.deepcopy(ind) for ind in elite])
+        with instrumentation.phase("elitism"):
+            # Una riga in più per il secondo figlio dell'ultima coppia, che viene scartato
+            new_population = Population(self.population_size + 1, self.population.num_aircraft, self.route_pool, self.grid,
+                                        self.config.max_simulation_time)
             
-            while len(new_population) < config.POPULATION_SIZE:
+            elite_size = max(1, self.population_size // 10)
+            elite = np.argsort(-self.population.fitness, kind='stable')[:elite_size]
+            for row, elite_row in enumerate(elite.tolist()):
+                new_population.copy_row(self.population, elite_row, row)
+        
+        pending = []
+        size = elite_size
+        while size < self.population_size:
+            with instrumentation.phase("selection"):
                 parent1 = self.tournament_selection()
                 parent2 = self.tournament_selection()
-                
-                child1, child2 = self.single_point_crossover(parent1, parent2)
-                
-                self.mutate_departure_time(child1)
-                self.mutate_departure_time(child2)
-                
-                self.mutate_with_astar_deviation(child1, self.grid)
-                self.mutate_with_astar_deviation(child2, self.grid)
-                
-                new_population.append(child1)
-                if len(new_population) < config.POPULATION_SIZE:
-                    new_population.append(child2)
             
-            self.population = new_population
+            child1, child2 = size, size + 1
+            with instrumentation.phase("crossover"):
+                self.single_point_crossover(parent1, parent2, new_population, child1, child2)
             
-            current_best_fitness = max(calculate_fitness(ind) for ind in self.population)
-            self.fitness_history.append(current_best_fitness)
+            with instrumentation.phase("mutation_departure"):
+                self.mutate_departure_time(new_population, child1)
+                self.mutate_departure_time(new_population, child2)
             
+            pending.append((child1, random.random()))
+            pending.append((child2, random.random()))
+            
+            size += 2
+        
+        new_population.truncate(self.population_size)
+        self.population = new_population
+        # Ripianificazione A* dei figli in collisione (include la loro valutazione)
+        with instrumentation.phase("mutation_astar"):
+            self.develop_offspring(new_population, [(row, choice) for row, choice in pending if row < self.population_size])
+        
+        with instrumentation.phase("evaluation"):
+            fitness = self.evaluate_population(self.population)
+        best_row = int(np.argmax(fitness))
+        current_best_fitness = float(fitness[best_row])
+        self._record_fitness(generation, current_best_fitness)
+        
+        with instrumentation.phase("bookkeeping"):
             if current_best_fitness > self.best_fitness:
                 self.best_fitness = current_best_fitness
-                self.best_solution = max(self.population, key=lambda ind: calculate_fitness(ind))
+                self.best_solution = self.get_solution(self.population, best_row)
             
             if self.save_snapshots and generation % self.snapshot_interval == 0:
-                best_ind = max(self.population, key=lambda ind: calculate_fitness(ind))
-                self.snapshots[generation] = copy.deepcopy(best_ind)
-            
-            if abs(current_best_fitness - previous_best_fitness) < 1e-6:
-                generations_without_improvement += 1
-            else:
-                generations_without_improvement = 0
-            
-            previous_best_fitness = current_best_fitness
-            
-            if generation % 10 == 0 or generation == config.MAX_GENERATIONS:
-                print(f"Gen {generation}: Best Fitness = {current_best_fitness:.2f}")
-            
-            if generations_without_improvement >= config.CONVERGENCE_GENERATIONS:
-                print(f"\nConvergenza raggiunta dopo {generation} generazioni")
-                if self.save_snapshots and generation not in self.snapshots:
-                    best_ind = max(self.population, key=lambda ind: calculate_fitness(ind))
-                    self.snapshots[generation] = copy.deepcopy(best_ind)
-                break
-        
-        print(f"\nAlgoritmo terminato. Best Fitness = {self.best_fitness:.2f}")
+                self._record_snapshot(generation, self.get_solution(self.population, best_row))
+        
+        if abs(current_best_fitness - self._previous_best_fitness) < 1e-6:
+            self._generations_without_improvement += 1
+        else:
+            self._generations_without_improvement = 0
+        
+        self._previous_best_fitness = current_best_fitness
+        
+        if generation % 10 == 0 or generation == self.config.max_generations:
+            self.log(f"Gen {generation}: Best Fitness = {current_best_fitness:.2f}")
+        
+        converged = self._generations_without_improvement >= self.config.convergence_generations
+        if converged and self.save_snapshots and generation != self._last_snapshot_generation:
+            self._record_snapshot(generation, self.get_solution(self.population, best_row))
+        
+        instrumentation.end_generation(generation, current_best_fitness, self.fitness_cache)
+        return converged
+    
+    def stop(self):
+        if self._evaluator is not None:
+            self._evaluator.close()
+            self._evaluator = None
+        self.instrumentation.close()
+    
+    def evolve(self):
+        self.start()
+        try:
+            for generation in range(1, self.config.max_generations+1):
+                if self.step(generation):
+                    self.log(f"\nConvergenza raggiunta dopo {generation} generazioni")
+                    break
+        finally:
+            self.stop()
+        
+        self.log(f"\nAlgoritmo terminato. Best Fitness = {self.best_fitness:.2f}")
+        cache = self.fitness_cache
+        self.log(f"Cache fitness: {cache.hits} hit, {cache.misses} miss ({cache.hit_rate:.1%})")
         return self.best_solution, self.fitness_history
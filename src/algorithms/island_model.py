@@ -0,0 +1,151 @@
+import multiprocessing
+import random
+from typing import List, Optional, Tuple
+from src.environment.environment import Environment
+from src.environment.aircraft import Aircraft
+from src.algorithms.genetic_algorithm import GeneticAlgorithm
+from config.run_config import RunConfig
+import config.config as config
+
+
+def _run_island(connection, environment: Environment, seed: Optional[int], population_size: int, run_config: RunConfig):
+    # Processo di un'isola: esegue i comandi del driver finché non riceve 'finish'.
+    # Le isole sono processi daemon e non possono avere figli: la valutazione resta seriale.
+    run_config = run_config.replace(evaluation_workers=1)
+    ga = GeneticAlgorithm(environment, seed=seed, population_size=population_size, verbose=False,
+                          run_config=run_config, workers=1)
+    ga.start()
+    generation = 0
+    try:
+        while True:
+            command, payload = connection.recv()
+            
+            if command == 'run':
+                generations, migration_size = payload
+                converged = False
+                for _ in range(generations):
+                    generation += 1
+                    converged = ga.step(generation)
+                connection.send((ga.fitness_history[-1], converged, ga.emigrants(migration_size)))
+            
+            elif command == 'immigrate':
+                for migrants in payload:
+                    ga.immigrate(migrants)
+            
+            elif command == 'finish':
+                connection.send((ga.best_solution, ga.best_fitness, ga.fitness_history))
+                break
+    finally:
+        ga.stop()
+        connection.close()
+
+
+class IslandModel:
+    """
+    Modello a isole: num_islands sottopopolazioni evolvono in processi separati sullo
+    stesso Environment e ogni migration_interval generazioni si scambiano i migliori
+    migration_size individui, lungo un anello o verso isole scelte a caso.
+    """
+    
+    def __init__(
+        self,
+        environment: Environment,
+        num_islands: int = config.NUM_ISLANDS,
+        migration_interval: int = config.MIGRATION_INTERVAL,
+        migration_size: int = config.MIGRATION_SIZE,
+        topology: str = config.MIGRATION_TOPOLOGY,
+        seed: Optional[int] = None,
+        population_size: Optional[int] = None,
+        run_config: Optional[RunConfig] = None):
+        if topology not in ("ring", "random"):
+            raise ValueError(f"Topologia di migrazione non valida: {topology}")
+        
+        self.environment = environment
+        self.config = run_config or environment.config
+        self.num_islands = num_islands
+        self.migration_interval = migration_interval
+        self.migration_size = migration_size
+        self.topology = topology
+        self.seed = seed
+        # Di default la popolazione complessiva resta quella di config, divisa tra le isole
+        self.population_size = population_size or max(2, self.config.population_size // num_islands)
+        self.rng = random.Random(seed)
+        
+        self.best_solution: List[Aircraft] = None
+        self.best_fitness: float = float('-inf')
+        self.best_island: int = -1
+        self.fitness_histories: List[List[float]] = []
+    
+    def _island_seed(self, island_id: int) -> Optional[int]:
+        return None if self.seed is None else self.seed + island_id
+    
+    def migration_targets(self) -> List[int]:
+        # targets[i] = isola che riceve gli emigranti dell'isola i
+        k = self.num_islands
+        if self.topology == "ring":
+            return [(i + 1) % k for i in range(k)]
+        return [self.rng.choice([j for j in range(k) if j != i]) for i in range(k)]
+    
+    def run(self) -> Tuple[List[Aircraft], List[List[float]]]:
+        # Le rotte tra aeroporti vengono calcolate una volta qui e ereditate dalle isole
+        self.environment.route_table
+        
+        print(f"Avvio di {self.num_islands} isole da {self.population_size} individui "
+              f"(migrazione ogni {self.migration_interval} generazioni, topologia {self.topology})")
+        
+        connections = []
+        processes = []
+        for island_id in range(self.num_islands):
+            parent_connection, child_connection = multiprocessing.Pipe()
+            process = multiprocessing.Process(
+                target=_run_island,
+                args=(child_connection, self.environment, self._island_seed(island_id), self.population_size, self.config),
+                daemon=True
+            )
+            process.start()
+            child_connection.close()
+            connections.append(parent_connection)
+            processes.append(process)
+        
+        try:
+            generation = 0
+            max_generations = self.config.max_generations
+            while generation < max_generations:
+                generations = min(self.migration_interval, max_generations - generation)
+                for connection in connections:
+                    connection.send(('run', (generations, self.migration_size)))
+                reports = [connection.recv() for connection in connections]
+                generation += generations
+                
+                best = ", ".join(f"{fitness:.2f}" for fitness, _, _ in reports)
+                print(f"Gen {generation}: Best Fitness per isola = [{best}]")
+                
+                if all(converged for _, converged, _ in reports):
+                    print(f"\nConvergenza raggiunta su tutte le isole dopo {generation} generazioni")
+                    break
+                
+                if self.num_islands > 1 and generation < max_generations:
+                    incoming = [[] for _ in range(self.num_islands)]
+                    for source, target in enumerate(self.migration_targets()):
+                        incoming[target].append(reports[source][2])
+                    for connection, migrants in zip(connections, incoming):
+                        connection.send(('immigrate', migrants))
+            
+            for connection in connections:
+                connection.send(('finish', None))
+            results = [connection.recv() for connection in connections]
+        finally:
+            for connection in connections:
+                connection.close()
+            for process in processes:
+                process.join()
+        
+        self.fitness_histories = [history for _, _, history in results]
+        for island_id, (solution, fitness, _) in enumerate(results):
+            if solution is not None and fitness > self.best_fitness:
+                self.best_solution = solution
+                self.best_fitness = fitness
+                self.best_island = island_id
+        
+        print(f"\nModello a isole terminato. Best Fitness = {self.best_fitness:.2f} (isola {self.best_island})")
+        return self.best_solution, self.fitness_histories
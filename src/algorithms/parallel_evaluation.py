@@ -0,0 +1,136 @@
+import math
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional, Tuple
+import numpy as np
+from src.environment.aircraft import Aircraft
+from src.environment.grid import Grid
+from src.utils.a_star import AStarStats, astar_path_temporal
+from src.utils.occupancy import OccupancyTable
+from src.utils.route_table import RouteTable
+from config.run_config import RunConfig
+
+Route = Tuple[Tuple[int, int], ...]
+
+
+class ReplanContext:
+    """
+    Dati statici per ripianificare e valutare un individuo: griglia, estremi di ogni aereo,
+    euristiche e impostazioni della run. Viene inviato una sola volta a ogni worker.
+    """
+    
+    def __init__(self, grid: Grid, aircraft: List[Aircraft], route_table: RouteTable, run_config: RunConfig):
+        self.grid = grid
+        self.starts = [a.start_position for a in aircraft]
+        self.destinations = [a.destination_position for a in aircraft]
+        # Un campo per aeroporto, condiviso tra gli aerei con la stessa destinazione
+        self.heuristic_fields = [route_table.distance_field(a.destination_airport_id) for a in aircraft]
+        self.allow_wait = run_config.temporal_allow_wait
+        self.max_expansions = run_config.temporal_max_expansions
+        self.horizon = run_config.max_simulation_time
+        self.num_aircraft = run_config.num_aircraft
+        self.collect_stats = False  # Se True i worker restituiscono anche le AStarStats
+
+
+def replan_colliding_aircraft(
+    occupancy: OccupancyTable,
+    choice: float,
+    context: ReplanContext,
+    stats: Optional[AStarStats] = None) -> Tuple[Optional[int], Optional[Route]]:
+    # Ripianifica con A* spazio-temporale uno degli aerei in collisione, scelto da choice in [0, 1).
+    # La tabella viene lasciata invariata; ritorna (indice aereo, nuova rotta o None).
+    colliding = occupancy.colliding_aircraft()
+    if not colliding:
+        return None, None
+    
+    index = colliding[min(int(choice * len(colliding)), len(colliding) - 1)]
+    departure, route = occupancy.trajectory(index)
+    
+    occupancy.release(index)
+    new_route = astar_path_temporal(
+        context.grid,
+        context.starts[index],
+        context.destinations[index],
+        departure,
+        occupancy,
+        heuristic_field=context.heuristic_fields[index],
+        allow_wait=context.allow_wait,
+        max_time=context.horizon,
+        max_expansions=context.max_expansions,
+        stats=stats
+    )
+    occupancy.reserve(index, departure, route)
+    
+    return index, tuple(new_route) if new_route is not None else None
+
+
+# ============================================================================
+# WORKER
+# ============================================================================
+
+_worker_context: Optional[ReplanContext] = None
+
+
+def _init_worker(context: ReplanContext):
+    global _worker_context
+    _worker_context = context
+
+
+def _develop_chunk(chunk) -> List[Tuple[Optional[int], Optional[Route], Tuple[float, int], Optional[AStarStats]]]:
+    routes, tasks = chunk
+    context = _worker_context
+    results = []
+    for departures, route_ids, choice in tasks:
+        table = OccupancyTable(context.grid, context.horizon, context.num_aircraft)
+        for index, (departure, route_id) in enumerate(zip(departures.tolist(), route_ids.tolist())):
+            table.reserve(index, departure, routes[route_id])
+        
+        index, new_route = None, None
+        stats = AStarStats() if context.collect_stats else None
+        if table.num_collisions > 0:
+            index, new_route = replan_colliding_aircraft(table, choice, context, stats)
+            if new_route is not None:
+                table.update(index, table.trajectory(index)[0], new_route)
+        
+        results.append((index, new_route, table.score(), stats if index is not None else None))
+    return results
+
+
+class ParallelEvaluator:
+    """
+    Pool persistente di processi che ripianifica e valuta i figli di una generazione.
+    Ai worker arrivano solo righe compatte (partenze, id di rotta) e le rotte usate dal blocco.
+    """
+    
+    def __init__(self, context: ReplanContext, workers: int, chunk_size: Optional[int] = None):
+        self.workers = workers
+        self.chunk_size = chunk_size
+        self._executor = ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_worker,
+            initargs=(context,)
+        )
+    
+    def develop(self, population, tasks: List[Tuple[int, float]]):
+        # tasks: [(riga, choice)]; i risultati tornano nello stesso ordine dei task
+        if not tasks:
+            return []
+        
+        chunk_size = self.chunk_size or max(1, math.ceil(len(tasks) / (self.workers * 4)))
+        chunks = []
+        for start in range(0, len(tasks), chunk_size):
+            block = tasks[start:start + chunk_size]
+            rows = [row for row, _ in block]
+            used = np.unique(population.route_ids[rows])
+            routes = {route_id: population.route_pool[route_id] for route_id in used.tolist()}
+            chunks.append((routes, [
+                (population.departures[row].copy(), population.route_ids[row].copy(), choice)
+                for row, choice in block
+            ]))
+        
+        results = []
+        for chunk_results in self._executor.map(_develop_chunk, chunks):
+            results.extend(chunk_results)
+        return results
+    
+    def close(self):
+        self._executor.shutdown()
@@ -0,0 +1,133 @@
+from typing import Dict, List, Optional, Sequence, Tuple
+import numpy as np
+from src.environment.aircraft import Aircraft
+from src.environment.grid import Grid
+from src.utils.fitness_cache import genome_key
+from src.utils.occupancy import OccupancyTable
+
+Route = Tuple[Tuple[int, int], ...]
+
+
+class RoutePool:
+    """
+    Pool condiviso di rotte immutabili: ogni rotta distinta è una tupla di celle
+    memorizzata una sola volta e identificata da un intero.
+    """
+    
+    def __init__(self):
+        self._routes: List[Route] = []
+        self._ids: Dict[Route, int] = {}
+    
+    def __len__(self) -> int:
+        return len(self._routes)
+    
+    def __getitem__(self, route_id: int) -> Route:
+        return self._routes[route_id]
+    
+    def intern(self, route: Sequence[Tuple[int, int]]) -> int:
+        if not isinstance(route, tuple):
+            route = tuple(tuple(pos) for pos in route)
+        route_id = self._ids.get(route)
+        if route_id is None:
+            route_id = len(self._routes)
+            self._routes.append(route)
+            self._ids[route] = route_id
+        return route_id
+
+
+class Population:
+    """
+    Popolazione in forma compatta: matrice (individui x aerei) dei tempi di partenza
+    e matrice degli id di rotta nel RoutePool, con fitness e occupazione in cache per riga.
+    Gli indici degli aerei coincidono con i loro id (come in Environment).
+    """
+    
+    def __init__(self, size: int, num_aircraft: int, route_pool: RoutePool, grid: Grid, horizon: int):
+        self.route_pool = route_pool
+        self.grid = grid
+        self.horizon = horizon  # Orizzonte delle tabelle di occupazione (max_simulation_time del run)
+        self.departures = np.zeros((size, num_aircraft), dtype=np.int64)
+        self.route_ids = np.zeros((size, num_aircraft), dtype=np.int64)
+        self.fitness = np.full(size, np.nan)  # NaN = da rivalutare
+        self.num_collisions = np.full(size, -1, dtype=np.int64)
+        self.occupancy: List[Optional[OccupancyTable]] = [None] * size
+    
+    def __len__(self) -> int:
+        return len(self.fitness)
+    
+    @property
+    def num_aircraft(self) -> int:
+        return self.departures.shape[1]
+    
+    def is_dirty(self, row: int) -> bool:
+        return np.isnan(self.fitness[row])
+    
+    def invalidate(self, row: int):
+        self.fitness[row] = np.nan
+        self.num_collisions[row] = -1
+    
+    def key(self, row: int) -> bytes:
+        return genome_key(self.departures[row], self.route_ids[row])
+    
+    def route(self, row: int, index: int) -> Route:
+        return self.route_pool[self.route_ids[row, index]]
+    
+    def copy_row(self, source: "Population", source_row: int, row: int):
+        # Copia geni e fitness; l'occupazione non viene copiata, get_occupancy la ricostruisce se serve
+        self.departures[row] = source.departures[source_row]
+        self.route_ids[row] = source.route_ids[source_row]
+        self.fitness[row] = source.fitness[source_row]
+        self.num_collisions[row] = source.num_collisions[source_row]
+        self.occupancy[row] = None
+    
+    def truncate(self, size: int):
+        self.departures = self.departures[:size]
+        self.route_ids = self.route_ids[:size]
+        self.fitness = self.fitness[:size]
+        self.num_collisions = self.num_collisions[:size]
+        self.occupancy = self.occupancy[:size]
+    
+    def get_occupancy(self, row: int) -> OccupancyTable:
+        if self.occupancy[row] is None:
+            table = OccupancyTable(self.grid, self.horizon, self.num_aircraft)
+            departures = self.departures[row].tolist()
+            for index, route_id in enumerate(self.route_ids[row].tolist()):
+                table.reserve(index, departures[index], self.route_pool[route_id])
+            self.occupancy[row] = table
+        return self.occupancy[row]
+    
+    def set_departure_time(self, row: int, index: int, time: int) -> bool:
+        # La mutazione dei tempi cambia molti geni: la tabella viene scartata e ricostruita in blocco
+        if self.departures[row, index] == time:
+            return False
+        self.departures[row, index] = time
+        self.invalidate(row)
+        self.occupancy[row] = None
+        return True
+    
+    def set_route(self, row: int, index: int, route_id: int) -> bool:
+        # Usata dalla ripianificazione A* di un singolo aereo: la tabella, se presente, si aggiorna in delta
+        if self.route_ids[row, index] == route_id:
+            return False
+        self.route_ids[row, index] = route_id
+        self.invalidate(row)
+        table = self.occupancy[row]
+        if table is not None:
+            table.update(index, int(self.departures[row, index]), self.route(row, index))
+        return True
+    
+    def to_aircraft(self, row: int, templates: List[Aircraft]) -> List[Aircraft]:
+        # Materializza una riga come lista di Aircraft (serializzazione, visualizzazione)
+        individual = []
+        for index, template in enumerate(templates):
+            aircraft = Aircraft(
+                template.id,
+                template.start_airport_id,
+                template.destination_airport_id,
+                template.start_position,
+                template.destination_position
+            )
+            aircraft.set_route(list(self.route(row, index)))
+            aircraft.set_departure_time(int(self.departures[row, index]))
+            individual.append(aircraft)
+        return individual
@@ -1,38 +1,55 @@
 import random
-from typing import List
+from typing import Dict, List, Optional, Tuple
+import numpy as np
 from src.environment.grid import Grid
 from src.environment.airport import Airport
 from src.environment.aircraft import Aircraft
-from src.utils.a_star import astar_path
-from config.config import (
-    GRID_SIZE,
-    NUM_AIRPORTS,
-    MIN_AIRPORT_DISTANCE,
-    NUM_AIRCRAFT
-)
+from src.environment.scenario import read_scenario, write_scenario
+from src.utils.route_table import RouteTable
+from config.run_config import RunConfig
 
 
 class Environment:
-    def __init__(self):        
-        self.grid = Grid(GRID_SIZE)
+    def __init__(self, route_cache_dir: Optional[str] = None, run_config: Optional[RunConfig] = None,
+                 scenario_path: Optional[str] = None):        
+        # Senza run_config si usano i valori correnti del modulo config
+        self.config = run_config or RunConfig.from_module()
+        scenario = read_scenario(scenario_path) if scenario_path is not None else None
+        if scenario is not None:
+            # Griglia, aeroporti e aerei vengono dal file; il resto della configurazione da run_config
+            self.config = self.config.replace(**scenario[0]["layout"])
+        self.grid = Grid(self.config.grid_size)
         self.airports: List[Airport] = []
         self.aircraft: List[Aircraft] = []
+        self.route_cache_dir = route_cache_dir  # Se impostato, la tabella delle rotte viene salvata su disco
+        self._route_table: Optional[RouteTable] = None
         
-        self._generate_airports()
-        self._generate_aircraft()
+        if scenario is not None:
+            self._load_scenario(*scenario)
+        elif self.config.generation_mode == "fast":
+            # Generatore NumPy derivato dal modulo random: lo scenario resta riproducibile con random.seed
+            rng = np.random.default_rng(random.getrandbits(64))
+            self._generate_airports_spatial_hash(rng)
+            self._generate_aircraft_bulk(rng)
+        else:
+            self._generate_airports()
+            self._generate_aircraft()
     
     def _generate_airports(self):
+        grid_size = self.config.grid_size
+        num_airports = self.config.num_airports
+        min_airport_distance = self.config.min_airport_distance
         attempts = 0
         max_attempts = 10000
         
-        while len(self.airports) < NUM_AIRPORTS and attempts < max_attempts:
-            row = random.randint(0, GRID_SIZE - 1)
-            col = random.randint(0, GRID_SIZE - 1)
+        while len(self.airports) < num_airports and attempts < max_attempts:
+            row = random.randint(0, grid_size - 1)
+            col = random.randint(0, grid_size - 1)
             position = (row, col)
             
             valid = True
             for airport in self.airports:
-                if self.grid.manhattan_distance(position, airport.position) < MIN_AIRPORT_DISTANCE:
+                if self.grid.manhattan_distance(position, airport.position) < min_airport_distance:
                     valid = False
                     break
             
@@ -42,18 +59,84 @@ class Environment:
             
             attempts += 1
         
-        if len(self.airports) < NUM_AIRPORTS:
+        if len(self.airports) < num_airports:
             raise ValueError(
-                f"Impossibile generare {NUM_AIRPORTS} aeroporti con distanza minima "
-                f"{MIN_AIRPORT_DISTANCE}. Ridurre NUM_AIRPORTS o MIN_AIRPORT_DISTANCE."
+                f"Impossibile generare {num_airports} aeroporti con distanza minima "
+                f"{min_airport_distance}. Ridurre NUM_AIRPORTS o MIN_AIRPORT_DISTANCE."
             )
     
+    def _generate_airports_spatial_hash(self, rng: np.random.Generator):
+        # Dart throwing senza ripetizioni: le celle vengono provate in ordine casuale e ogni
+        # candidato è confrontato solo con gli aeroporti nei 3x3 bucket vicini di uno spatial hash
+        # con lato min_airport_distance (distanza di Manhattan < d implica |dr| < d e |dc| < d).
+        # Fallisce solo se nessuna cella della griglia può più ospitare un aeroporto.
+        grid_size = self.config.grid_size
+        num_airports = self.config.num_airports
+        min_airport_distance = self.config.min_airport_distance
+        bucket_size = max(min_airport_distance, 1)
+        buckets: Dict[Tuple[int, int], List[Tuple[int, int]]] = {}
+        
+        for cell in rng.permutation(grid_size * grid_size).tolist():
+            if len(self.airports) >= num_airports:
+                break
+            row, col = divmod(cell, grid_size)
+            bucket_row, bucket_col = row // bucket_size, col // bucket_size
+            
+            valid = True
+            for dr in (-1, 0, 1):
+                for dc in (-1, 0, 1):
+                    for other_row, other_col in buckets.get((bucket_row + dr, bucket_col + dc), ()):
+                        if abs(row - other_row) + abs(col - other_col) < min_airport_distance:
+                            valid = False
+                            break
+                    if not valid:
+                        break
+                if not valid:
+                    break
+            
+            if valid:
+                buckets.setdefault((bucket_row, bucket_col), []).append((row, col))
+                self.airports.append(Airport(len(self.airports), (row, col)))
+        
+        if len(self.airports) < num_airports:
+            raise ValueError(
+                f"Impossibile generare {num_airports} aeroporti con distanza minima "
+                f"{min_airport_distance}. Ridurre NUM_AIRPORTS o MIN_AIRPORT_DISTANCE."
+            )
+    
+    def _generate_aircraft_bulk(self, rng: np.random.Generator):
+        # Stessa distribuzione di _generate_aircraft (almeno un aereo per aeroporto, destinazione
+        # uniforme tra gli altri aeroporti) calcolata con operazioni vettoriali
+        num_airports = self.config.num_airports
+        remaining = max(self.config.num_aircraft - num_airports, 0)
+        counts = 1 + np.bincount(rng.integers(0, num_airports, size=remaining), minlength=num_airports)
+        
+        starts = np.repeat(np.arange(num_airports), counts)
+        destinations = rng.integers(0, num_airports - 1, size=len(starts))
+        destinations += destinations >= starts
+        
+        for airport, count in zip(self.airports, counts.tolist()):
+            airport.aircraft_count = count
+        
+        airports = self.airports
+        for aircraft_id, (start_idx, dest_idx) in enumerate(zip(starts.tolist(), destinations.tolist())):
+            start_airport = airports[start_idx]
+            dest_airport = airports[dest_idx]
+            self.aircraft.append(Aircraft(
+                aircraft_id=aircraft_id,
+                start_airport_id=start_airport.id,
+                destination_airport_id=dest_airport.id,
+                start_position=start_airport.position,
+                destination_position=dest_airport.position
+            ))
+    
     def _generate_aircraft(self):
-        aircraft_per_airport = [1] * NUM_AIRPORTS
-        remaining = NUM_AIRCRAFT - NUM_AIRPORTS
+        num_airports = self.config.num_airports
+        aircraft_per_airport = [1] * num_airports
+        remaining = self.config.num_aircraft - num_airports
         
         for _ in range(remaining):
-            airport_idx = random.randint(0, NUM_AIRPORTS - 1)
+            airport_idx = random.randint(0, num_airports - 1)
             aircraft_per_airport[airport_idx] += 1
         
         aircraft_id = 0
@@ -62,7 +145,7 @@ class Environment:
             start_airport.aircraft_count = count
             
             for _ in range(count):
-                dest_idx = random.choice([i for i in range(NUM_AIRPORTS) if i != airport_idx])
+                dest_idx = random.choice([i for i in range(num_airports) if i != airport_idx])
                 dest_airport = self.airports[dest_idx]
                 
                 aircraft = Aircraft(
@@ -76,19 +159,76 @@ class Environment:
                 self.aircraft.append(aircraft)
                 aircraft_id += 1
     
+    def _load_scenario(self, metadata: Dict, arrays: Dict[str, np.ndarray]):
+        obstacles = arrays["obstacles"]
+        if obstacles.any():
+            self.grid.grid[:] = obstacles
+            self.grid._build_neighbor_tables()
+        
+        self.airports = [Airport(airport_id, (row, col)) for airport_id, (row, col) in enumerate(arrays["airports"].tolist())]
+        for airport, count in zip(self.airports, np.bincount(arrays["aircraft"][:, 0], minlength=len(self.airports)).tolist()):
+            airport.aircraft_count = count
+        
+        airports = self.airports
+        self.aircraft = [
+            Aircraft(
+                aircraft_id=aircraft_id,
+                start_airport_id=start_idx,
+                destination_airport_id=dest_idx,
+                start_position=airports[start_idx].position,
+                destination_position=airports[dest_idx].position
+            )
+            for aircraft_id, (start_idx, dest_idx) in enumerate(arrays["aircraft"].tolist())
+        ]
+        
+        # Rotte e campi di distanza restano mappati sul file e vengono decodificati su richiesta
+        self._route_table = RouteTable(self.grid, self.airports)
+        self._route_table.attach_arrays(arrays)
+    
+    def save_scenario(self, path: str, distance_fields: bool = False) -> str:
+        # Salva griglia, aeroporti, coppie origine-destinazione e tabella delle rotte in un file binario
+        # ricaricabile con Environment(scenario_path=path). Con distance_fields=True include anche
+        # i campi di distanza verso ogni destinazione (euristica dell'A* spazio-temporale).
+        route_table = self.route_table
+        if distance_fields:
+            for airport_id in sorted({aircraft.destination_airport_id for aircraft in self.aircraft}):
+                route_table.distance_field(airport_id)
+        
+        metadata = {
+            "layout": {
+                "grid_size": self.config.grid_size,
+                "num_airports": len(self.airports),
+                "num_aircraft": len(self.aircraft),
+                "min_airport_distance": self.config.min_airport_distance
+            }
+        }
+        arrays = {
+            "obstacles": self.grid.grid,
+            "airports": np.array([airport.position for airport in self.airports], dtype=np.int32).reshape(-1, 2),
+            "aircraft": np.array(
+                [(aircraft.start_airport_id, aircraft.destination_airport_id) for aircraft in self.aircraft],
+                dtype=np.int32
+            ).reshape(-1, 2),
+            **route_table.to_arrays()
+        }
+        return write_scenario(path, metadata, arrays)
+    
+    @property
+    def route_table(self) -> RouteTable:
+        # Percorsi tra tutte le coppie di aeroporti, calcolati (o caricati) una sola volta
+        if self._route_table is None:
+            self._route_table = RouteTable.build(self.grid, self.airports, self.route_cache_dir)
+        return self._route_table
+    
     def initialize_routes_with_astar(self):
         for aircraft in self.aircraft:
-            route = astar_path(
-                self.grid,
-                aircraft.start_position,
-                aircraft.destination_position
-            )
-            
-            if route is None:
+            try:
+                route = self.route_table.route(aircraft.start_airport_id, aircraft.destination_airport_id)
+            except ValueError:
                 raise ValueError(
                     f"Impossibile trovare un percorso per l'aereo {aircraft.id} "
                     f"da {aircraft.start_position} a {aircraft.destination_position}"
                 )
             
-            aircraft.set_route(route)
+            aircraft.set_route(list(route))
             aircraft.set_departure_time(0)
\ No newline at end of file
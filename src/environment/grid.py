@@ -1,29 +1,113 @@
-from typing import Tuple, List
+from typing import Dict, Tuple, List, Optional
+import numpy as np
 from config.config import DIRECTIONS
 
+DIAGONAL_COST = 1.414
+STRAIGHT_COST = 1.0
+WAIT_COST = 1.0  # Costo di un tick di attesa sul posto (A* spazio-temporale)
+
+
+class _CellPositions(dict):
+    """Coordinate (riga, colonna) per indice piatto di cella, create al primo accesso."""
+    
+    def __init__(self, cols: int):
+        super().__init__()
+        self.cols = cols
+    
+    def __missing__(self, cell: int) -> Tuple[int, int]:
+        position = self[cell] = divmod(int(cell), self.cols)
+        return position
+
+
+class _CellNeighbors(dict):
+    """
+    Liste (vicino, costo) per indice piatto di cella, ricavate da neighbor_index al primo accesso.
+    Le celle già visitate si leggono con un normale lookup di dizionario, senza allocazioni.
+    """
+    
+    def __init__(self, neighbor_index: np.ndarray, costs: List[float], wait_cost: Optional[float] = None):
+        super().__init__()
+        self.neighbor_index = neighbor_index
+        self.costs = costs
+        self.wait_cost = wait_cost  # Se presente, in coda c'è anche l'attesa sul posto (cella, wait_cost)
+    
+    def __missing__(self, cell: int) -> List[Tuple[int, float]]:
+        costs = self.costs
+        neighbors = self[cell] = [
+            (neighbor, costs[k]) for k, neighbor in enumerate(self.neighbor_index[cell].tolist()) if neighbor >= 0
+        ]
+        if self.wait_cost is not None:
+            neighbors.append((int(cell), self.wait_cost))
+        return neighbors
+
 
 class Grid:
     def __init__(self, size: int):
         self.size = size
         self.rows = size
         self.cols = size
+        self.num_cells = size * size
         # Griglia 2D: 0 = libero, 1 = ostacolo (attualmente tutto libero)
-        self.grid = [[0 for _ in range(size)] for _ in range(size)]
+        self.grid = np.zeros((size, size), dtype=np.uint8)
+        self._build_neighbor_tables()
+    
+    def __getstate__(self):
+        # Le tabelle derivate non vengono serializzate (pool di processi, isole): si ricostruiscono
+        return {'size': self.size, 'grid': self.grid}
+    
+    def __setstate__(self, state):
+        size = state['size']
+        self.size = size
+        self.rows = size
+        self.cols = size
+        self.num_cells = size * size
+        self.grid = state['grid']
+        self._build_neighbor_tables()
+    
+    def _build_neighbor_tables(self):
+        # neighbor_index[cell, k] = cella raggiunta con DIRECTIONS[k], -1 se fuori griglia o ostacolo
+        rows, cols = np.divmod(np.arange(self.num_cells, dtype=np.int32), self.cols)
+        self.neighbor_index = np.full((self.num_cells, len(DIRECTIONS)), -1, dtype=np.int32)
+        self.direction_cost = np.array(
+            [DIAGONAL_COST if dr != 0 and dc != 0 else STRAIGHT_COST for dr, dc in DIRECTIONS]
+        )
+        free = (self.grid.ravel() == 0)
+        
+        for k, (dr, dc) in enumerate(DIRECTIONS):
+            new_rows = rows + dr
+            new_cols = cols + dc
+            valid = (new_rows >= 0) & (new_rows < self.rows) & (new_cols >= 0) & (new_cols < self.cols)
+            target = np.where(valid, new_rows * self.cols + new_cols, 0)
+            valid &= free[target] & free
+            self.neighbor_index[:, k] = np.where(valid, target, -1)
+        
+        # Coordinate e liste (vicino, costo) per cella, create solo per le celle effettivamente visitate:
+        # A* le legge con un lookup di dizionario, senza allocare nulla per espansione
+        self.positions: Dict[int, Tuple[int, int]] = _CellPositions(self.cols)
+        costs = self.direction_cost.tolist()
+        self.neighbors: Dict[int, List[Tuple[int, float]]] = _CellNeighbors(self.neighbor_index, costs)
+        self.neighbors_with_wait: Dict[int, List[Tuple[int, float]]] = _CellNeighbors(
+            self.neighbor_index, costs, WAIT_COST
+        )
+    
+    def set_obstacle(self, position: Tuple[int, int], blocked: bool = True):
+        row, col = position
+        self.grid[row, col] = 1 if blocked else 0
+        self._build_neighbor_tables()
+    
+    def is_obstacle(self, position: Tuple[int, int]) -> bool:
+        return bool(self.grid[position[0], position[1]])
+    
+    def to_index(self, position: Tuple[int, int]) -> int:
+        return position[0] * self.cols + position[1]
     
     def is_valid_position(self, position: Tuple[int, int]) -> bool:
         row, col = position
         return 0 <= row < self.size and 0 <= col < self.size
     
     def get_neighbors(self, position: Tuple[int, int]) -> List[Tuple[int, int]]:
-        row, col = position
-        neighbors = []
-        
-        for dr, dc in DIRECTIONS:
-            new_pos = (row + dr, col + dc)
-            if self.is_valid_position(new_pos):
-                neighbors.append(new_pos)
-        
-        return neighbors
+        positions = self.positions
+        return [positions[neighbor] for neighbor, _ in self.neighbors[self.to_index(position)]]
     
     def manhattan_distance(self, pos1: Tuple[int, int], pos2: Tuple[int, int]) -> int:
         return abs(pos1[0] - pos2[0]) + abs(pos1[1] - pos2[1])
@@ -0,0 +1,74 @@
+import json
+import os
+import struct
+from typing import Any, Dict, Tuple
+import numpy as np
+
+# Formato del file di scenario:
+#   magic (8 byte) | lunghezza header (uint64 little endian) | header JSON | array grezzi
+# Gli array iniziano a offset allineati a 64 byte e vengono letti con np.memmap senza copie:
+# il caricamento costa solo la lettura dell'header, i dati vengono paginati quando servono.
+SCENARIO_MAGIC = b"PCSCENv1"
+SCENARIO_VERSION = 1
+ALIGNMENT = 64
+
+
+def _align(offset: int) -> int:
+    return (offset + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+
+def write_scenario(path: str, metadata: Dict[str, Any], arrays: Dict[str, np.ndarray]) -> str:
+    arrays = {name: np.ascontiguousarray(array) for name, array in arrays.items()}
+    
+    layout = {}
+    offset = 0
+    for name, array in arrays.items():
+        layout[name] = {"dtype": array.dtype.str, "shape": list(array.shape), "offset": offset}
+        offset = _align(offset + array.nbytes)
+    
+    header = json.dumps({
+        "version": SCENARIO_VERSION,
+        "metadata": metadata,
+        "arrays": layout
+    }).encode()
+    data_start = _align(len(SCENARIO_MAGIC) + 8 + len(header))
+    
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    
+    # Scrittura atomica come per la cache delle rotte
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    with open(temp_path, "wb") as f:
+        f.write(SCENARIO_MAGIC)
+        f.write(struct.pack("<Q", len(header)))
+        f.write(header)
+        for name, array in arrays.items():
+            f.seek(data_start + layout[name]["offset"])
+            f.write(array.tobytes())
+        f.truncate(data_start + offset)
+    os.replace(temp_path, path)
+    return path
+
+
+def read_scenario(path: str) -> Tuple[Dict[str, Any], Dict[str, np.ndarray]]:
+    # Ritorna (metadati, array in sola lettura mappati sul file)
+    with open(path, "rb") as f:
+        if f.read(len(SCENARIO_MAGIC)) != SCENARIO_MAGIC:
+            raise ValueError(f"{path} non è un file di scenario valido")
+        (header_length,) = struct.unpack("<Q", f.read(8))
+        header = json.loads(f.read(header_length))
+    
+    if header["version"] != SCENARIO_VERSION:
+        raise ValueError(f"Versione dello scenario non supportata: {header['version']}")
+    
+    data_start = _align(len(SCENARIO_MAGIC) + 8 + header_length)
+    arrays = {}
+    for name, spec in header["arrays"].items():
+        dtype = np.dtype(spec["dtype"])
+        shape = tuple(spec["shape"])
+        if int(np.prod(shape)) == 0:
+            arrays[name] = np.empty(shape, dtype=dtype)  # np.memmap non accetta array vuoti
+        else:
+            arrays[name] = np.memmap(path, dtype=dtype, mode="r", offset=data_start + spec["offset"], shape=shape)
+    return header["metadata"], arrays
@@ -1,73 +1,198 @@
 import heapq
-from typing import List, Tuple, Optional, Set, Dict
-from src.environment.grid import Grid
+import time
+from typing import Any, List, Tuple, Optional, Set, Dict, Union, Sequence
+from src.environment.grid import Grid, DIAGONAL_COST, STRAIGHT_COST
+from src.utils.occupancy import OccupancyTable
 
+DIAGONAL_EXTRA = DIAGONAL_COST - 2 * STRAIGHT_COST
 
-def heuristic(pos1: Tuple[int, int], pos2: Tuple[int, int]) -> float: #Distance euclidea
-    return ((pos1[0] - pos2[0])**2 + (pos1[1] - pos2[1])**2)**0.5
+
+class AStarStats:
+    """
+    Statistiche di una ricerca A*: nodi espansi, inserimenti nello heap, estrazioni di
+    nodi già chiusi (stale), dimensione massima dell'open set, tempo e esito.
+    status: 'found', 'no_path', 'budget' (espansioni esaurite), 'horizon' (nessun percorso
+    entro max_time), 'unreachable' (goal irraggiungibile secondo heuristic_field).
+    """
+    
+    def __init__(self):
+        self.expanded = 0
+        self.pushes = 0
+        self.stale_pops = 0
+        self.peak_open = 0
+        self.horizon_pruned = 0  # Solo spazio-temporale: espansioni troncate dall'orizzonte
+        self.path_length = 0
+        self.time = 0.0
+        self.status = ""
+    
+    def as_dict(self) -> Dict[str, Any]:
+        return dict(self.__dict__)
+
+
+class AStarStatsAggregate:
+    """Somma delle statistiche A* di una run, complessiva e per aereo."""
+    
+    COUNTERS = ("expanded", "pushes", "stale_pops", "horizon_pruned", "time")
+    
+    def __init__(self):
+        self.searches = 0
+        self.totals: Dict[str, float] = {name: 0 for name in self.COUNTERS}
+        self.peak_open = 0
+        self.status_counts: Dict[str, int] = {}
+        self.per_aircraft: Dict[int, Dict[str, float]] = {}
+        self.slowest: List[Tuple[float, Optional[int], Dict[str, Any]]] = []  # (tempo, aereo, statistiche)
+        self.keep_slowest = 10
+    
+    def add(self, stats: AStarStats, aircraft_id: Optional[int] = None):
+        self.searches += 1
+        for name in self.COUNTERS:
+            self.totals[name] += getattr(stats, name)
+        self.peak_open = max(self.peak_open, stats.peak_open)
+        self.status_counts[stats.status] = self.status_counts.get(stats.status, 0) + 1
+        
+        if aircraft_id is not None:
+            entry = self.per_aircraft.setdefault(aircraft_id, {"searches": 0, **{name: 0 for name in self.COUNTERS}})
+            entry["searches"] += 1
+            for name in self.COUNTERS:
+                entry[name] += getattr(stats, name)
+        
+        # Le ricerche più lente, per individuare i ripianificamenti patologici
+        self.slowest.append((stats.time, aircraft_id, stats.as_dict()))
+        self.slowest.sort(key=lambda item: -item[0])
+        del self.slowest[self.keep_slowest:]
+    
+    def worst_aircraft(self, count: int = 10, key: str = "expanded") -> List[Tuple[int, Dict[str, float]]]:
+        return sorted(self.per_aircraft.items(), key=lambda item: -item[1][key])[:count]
+    
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "searches": self.searches,
+            **self.totals,
+            "peak_open": self.peak_open,
+            "status": dict(self.status_counts),
+            "mean_expanded": self.totals["expanded"] / self.searches if self.searches else 0.0
+        }
+
+
+def heuristic(pos1: Tuple[int, int], pos2: Tuple[int, int]) -> float: # Distanza octile, coerente con i costi 1.0 / 1.414
+    dr = abs(pos1[0] - pos2[0])
+    dc = abs(pos1[1] - pos2[1])
+    return STRAIGHT_COST * (dr + dc) + DIAGONAL_EXTRA * min(dr, dc)
 
 
 def astar_path(
     grid: Grid,
     start: Tuple[int, int],
-    goal: Tuple[int, int]):
+    goal: Tuple[int, int],
+    stats: Optional[AStarStats] = None):
+    # stats: se fornito viene riempito con le statistiche della ricerca
+    if stats is not None:
+        started = time.perf_counter()
+        track_open = True
+    else:
+        track_open = False
+    peak_open = 1
+    
+    positions = grid.positions
+    neighbors = grid.neighbors
+    start_index = grid.to_index(start)
+    goal_index = grid.to_index(goal)
+    goal_row, goal_col = goal
     
     counter = 0 # counter serve per risolvere i tie-breaking
-    open_set = [(0, counter, start)]
+    open_set = [(0, counter, start_index)]
     counter += 1
     
-    open_set_hash: Set[Tuple[int, int]] = {start} # nodi da esplorare
-    closed_set: Set[Tuple[int, int]] = set() # nodi già esplorati
+    closed_set: Set[int] = set() # nodi già esplorati
     
-    came_from: Dict[Tuple[int, int], Tuple[int, int]] = {} # percorso da inizio alla fine
-    g_score: Dict[Tuple[int, int], float] = {start: 0} # costo dal nodo iniziale
+    came_from: Dict[int, int] = {} # percorso da inizio alla fine
+    g_score: Dict[int, float] = {start_index: 0} # costo dal nodo iniziale
     
+    path = None
     while open_set:
         _, _, current = heapq.heappop(open_set)
         
         if current in closed_set: # già esplorato
             continue
         
-        if current == goal: # percorso trovato
-            return reconstruct_path(came_from, current)
+        if current == goal_index: # percorso trovato
+            path = reconstruct_path(came_from, current, positions)
+            break
         
-        open_set_hash.discard(current)
         closed_set.add(current)
+        current_g = g_score[current]
         
-        for neighbor in grid.get_neighbors(current):
+        for neighbor, cost in neighbors[current]:
             if neighbor in closed_set:
                 continue
             
-            if abs(neighbor[0] - current[0]) + abs(neighbor[1] - current[1]) == 2:
-                cost = 1.414  # Diagonale
-            else:
-                cost = 1.0  # Ortogonale
-            
-            tentative_g_score = g_score[current] + cost
+            tentative_g_score = current_g + cost
             
-            if neighbor not in g_score or tentative_g_score < g_score[neighbor]:
+            if tentative_g_score < g_score.get(neighbor, float('inf')):
                 came_from[neighbor] = current
                 g_score[neighbor] = tentative_g_score
-                f_score = tentative_g_score + heuristic(neighbor, goal)
-                
-                if neighbor not in open_set_hash:
-                    heapq.heappush(open_set, (f_score, counter, neighbor))
-                    counter += 1
-                    open_set_hash.add(neighbor)
+                row, col = positions[neighbor]
+                dr = abs(row - goal_row)
+                dc = abs(col - goal_col)
+                h = STRAIGHT_COST * (dr + dc) + DIAGONAL_EXTRA * (dr if dr < dc else dc)
+                heapq.heappush(open_set, (tentative_g_score + h, counter, neighbor))
+                counter += 1
+                if track_open and len(open_set) > peak_open:
+                    peak_open = len(open_set)
     
-    return None
+    if stats is not None:
+        _fill_stats(stats, started, counter, open_set, len(closed_set), peak_open, path, "found" if path else "no_path")
+    return path
+
+
+def _fill_stats(stats: AStarStats, started: float, counter: int, open_set: list, expanded: int,
+                peak_open: int, path, status: str):
+    # Inserimenti e estrazioni si ricavano dal contatore dei tie-break e dall'open set residuo.
+    # Con 'found' e 'budget' l'ultimo nodo estratto non è né espanso né stale.
+    stats.pushes = counter
+    pops = counter - len(open_set)
+    stats.expanded = expanded
+    stats.stale_pops = pops - expanded - (1 if status in ("found", "budget") else 0)
+    stats.peak_open = peak_open
+    stats.path_length = len(path) if path is not None else 0
+    stats.status = status
+    stats.time = time.perf_counter() - started
 
 
 def reconstruct_path(
-    came_from: Dict[Tuple[int, int], Tuple[int, int]],
-    current: Tuple[int, int]): # ricostruisce il percorso dal dizionario came_from
-    path = [current]
+    came_from: Dict[int, int],
+    current: int,
+    positions: List[Tuple[int, int]]): # ricostruisce il percorso dal dizionario came_from
+    path = [positions[current]]
     while current in came_from:
         current = came_from[current]
-        path.append(current)
+        path.append(positions[current])
     path.reverse()
     return path
 
+def distance_field(grid: Grid, goal: Tuple[int, int]) -> List[float]:
+    # Dijkstra all'indietro dal goal: distanza minima (con ostacoli) di ogni cella dal goal.
+    # Usata come euristica esatta per astar_path_temporal; inf = cella che non raggiunge il goal.
+    neighbors = grid.neighbors
+    goal_index = grid.to_index(goal)
+    distance = [float('inf')] * grid.num_cells
+    distance[goal_index] = 0.0
+    
+    open_set = [(0.0, goal_index)]
+    while open_set:
+        current_distance, current = heapq.heappop(open_set)
+        if current_distance > distance[current]:
+            continue
+        
+        # I costi sono simmetrici: i vicini in avanti sono anche i predecessori
+        for neighbor, cost in neighbors[current]:
+            new_distance = current_distance + cost
+            if new_distance < distance[neighbor]:
+                distance[neighbor] = new_distance
+                heapq.heappush(open_set, (new_distance, neighbor))
+    
+    return distance
+
 # ============================================================================
 # A* SPAZIO-TEMPORALE
 # ============================================================================
@@ -77,20 +202,66 @@ def astar_path_temporal(
     start: Tuple[int, int],
     goal: Tuple[int, int],
     departure_time: int,
-    occupied_cells: Dict[Tuple[int, int, int], int]):
+    reservations: Union[OccupancyTable, Dict[Tuple[int, int, int], int]],
+    max_time: int,
+    max_expansions: int,
+    heuristic_field: Optional[Sequence[float]] = None,
+    allow_wait: bool = False,
+    stats: Optional[AStarStats] = None,
+    return_status: bool = False):
+    # stats: se fornito viene riempito con le statistiche della ricerca (AStarStats).
+    # heuristic_field: distance_field del goal (euristica esatta); se assente si usa la distanza octile.
+    # allow_wait: consente di restare nella cella corrente per un tick.
+    # max_time / max_expansions: orizzonte temporale e budget di espansioni (dalla RunConfig della run);
+    # se superati la ricerca termina subito restituendo None, come quando il percorso non esiste.
+    # return_status: ritorna (percorso, esito) per distinguere i casi con percorso None:
+    # 'no_path' / 'unreachable' (non instradabile) da 'budget' / 'horizon' (ricerca interrotta).
+    
+    if stats is not None:
+        started = time.perf_counter()
+        track_open = True
+    else:
+        track_open = False
+    peak_open = 1
+    horizon_pruned = 0
     
-    start_state = (start[0], start[1], departure_time)
+    positions = grid.positions
+    neighbors = grid.neighbors_with_wait if allow_wait else grid.neighbors  # Attesa già inclusa
+    num_cells = grid.num_cells
+    
+    # La tabella delle prenotazioni usa la stessa codifica degli stati: query dirette O(1).
+    # Un dizionario {(row, col, t): id} viene convertito una volta sola.
+    if isinstance(reservations, OccupancyTable):
+        reserved = reservations.reserved_states
+    else:
+        reserved = {t * num_cells + grid.to_index((row, col)) for row, col, t in reservations}
+    goal_index = grid.to_index(goal)
+    goal_row, goal_col = goal
+    
+    start_index = grid.to_index(start)
+    if heuristic_field is not None:
+        if not isinstance(heuristic_field, list):
+            heuristic_field = list(heuristic_field)
+        if heuristic_field[start_index] == float('inf'):
+            if stats is not None:
+                _fill_stats(stats, started, 0, [], 0, 0, None, "unreachable")
+            return (None, "unreachable") if return_status else None  # Goal irraggiungibile anche senza altri aerei
+    
+    # Stato (cella, tempo) codificato come intero: t * num_cells + cella
+    start_state = departure_time * num_cells + start_index
     
     counter = 0
     open_set = [(0, counter, start_state)]
     counter += 1
     
-    open_set_hash: Set[Tuple[int, int, int]] = {start_state} # nodi da esplorare
-    closed_set: Set[Tuple[int, int, int]] = set() # nodi già esplorati
+    closed_set: Set[int] = set() # nodi già esplorati
     
-    came_from: Dict[Tuple[int, int, int], Tuple[int, int, int]] = {} # percorso da inizio alla fine
-    g_score: Dict[Tuple[int, int, int], float] = {start_state: 0} # costo dal nodo iniziale
+    came_from: Dict[int, int] = {} # percorso da inizio alla fine
+    g_score: Dict[int, float] = {start_state: 0} # costo dal nodo iniziale
     
+    expansions = 0
+    path = None
+    status = "no_path"
     
     while open_set:
         _, _, current = heapq.heappop(open_set)
@@ -98,74 +269,77 @@ def astar_path_temporal(
         if current in closed_set:
             continue
         
-        current_row, current_col, current_time = current
+        current_time, current_index = divmod(current, num_cells)
         
-        if (current_row, current_col) == goal:
-            return reconstruct_path_temporal(came_from, current, start)
+        if current_index == goal_index:
+            path = reconstruct_path_temporal(came_from, current, num_cells, positions)
+            status = "found"
+            break
         
-        open_set_hash.discard(current)
-        closed_set.add(current)
+        expansions += 1
+        if expansions > max_expansions:
+            expansions -= 1  # Il nodo estratto non viene espanso
+            status = "budget"  # Budget esaurito
+            break
         
-        directions = [
-            (-1, 0), (1, 0), (0, -1), (0, 1),
-            (-1, -1), (-1, 1), (1, -1), (1, 1)
-        ]
+        closed_set.add(current)
+        current_g = g_score[current]
+        new_time = current_time + 1
+        if new_time > max_time:
+            horizon_pruned += 1
+            continue  # Oltre l'orizzonte
+        time_offset = new_time * num_cells
         
-        for dr, dc in directions:
-            new_row = current_row + dr
-            new_col = current_col + dc
-            new_time = current_time + 1
+        for neighbor_index, cost in neighbors[current_index]:
+            neighbor = time_offset + neighbor_index
             
-            # Controllo limiti griglia
-            if not (0 <= new_row < grid.rows and 0 <= new_col < grid.cols):
+            # Controllo celle prenotate nel tempo
+            if neighbor in reserved:
                 continue
             
-            # Controllo ostacoli fissi
-            if grid.grid[new_row][new_col] == 1:
-                continue
-            
-            # Controllo celle occupate nel tempo
-            if (new_row, new_col, new_time) in occupied_cells:
-                continue
-            
-            neighbor = (new_row, new_col, new_time)
-            
             if neighbor in closed_set:
                 continue
             
-            if abs(dr) == 1 and abs(dc) == 1:
-                cost = 1.414
-            else:
-                cost = 1.0 
+            tentative_g_score = current_g + cost
             
-            tentative_g_score = g_score[current] + cost
-            
-            if neighbor not in g_score or tentative_g_score < g_score[neighbor]: # miglior percorso trovato per il vicino
+            if tentative_g_score < g_score.get(neighbor, float('inf')): # miglior percorso trovato per il vicino
+                if heuristic_field is not None:
+                    h = heuristic_field[neighbor_index]
+                    if h == float('inf'):
+                        continue  # Dal vicino il goal non è raggiungibile
+                else:
+                    # Euristica: distanza octile
+                    row, col = positions[neighbor_index]
+                    dr = abs(row - goal_row)
+                    dc = abs(col - goal_col)
+                    h = STRAIGHT_COST * (dr + dc) + DIAGONAL_EXTRA * (dr if dr < dc else dc)
+                
                 came_from[neighbor] = current
                 g_score[neighbor] = tentative_g_score
-                
-                # Euristica: distanza euclidea
-                h = heuristic((new_row, new_col), goal)
-                f_score = tentative_g_score + h
-                
-                if neighbor not in open_set_hash:
-                    heapq.heappush(open_set, (f_score, counter, neighbor))
-                    counter += 1
-                    open_set_hash.add(neighbor)
+                heapq.heappush(open_set, (tentative_g_score + h, counter, neighbor))
+                counter += 1
+                if track_open and len(open_set) > peak_open:
+                    peak_open = len(open_set)
     
-    return None
+    if status == "no_path" and horizon_pruned:
+        status = "horizon"
+    if stats is not None:
+        _fill_stats(stats, started, counter, open_set, expansions, peak_open, path, status)
+        stats.horizon_pruned = horizon_pruned
+    return (path, status) if return_status else path
 
 
 # Ritorna solo le coordinate (row, col), senza il tempo.
 def reconstruct_path_temporal(
-    came_from: Dict[Tuple[int, int, int], Tuple[int, int, int]],
-    current: Tuple[int, int, int],
-    start: Tuple[int, int]):
-    path = [(current[0], current[1])]  # Solo (row, col)
+    came_from: Dict[int, int],
+    current: int,
+    num_cells: int,
+    positions: List[Tuple[int, int]]):
+    path = [positions[current % num_cells]]  # Solo (row, col)
     
     while current in came_from:
         current = came_from[current]
-        path.append((current[0], current[1]))
+        path.append(positions[current % num_cells])
     
     path.reverse()
-    return path
\ No newline at end of file
+    return path
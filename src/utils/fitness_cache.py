@@ -0,0 +1,80 @@
+import hashlib
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+import numpy as np
+
+Score = Tuple[float, int]  # (fitness, num_collisions)
+
+
+def genome_key(departures: np.ndarray, route_ids: np.ndarray) -> bytes:
+    # Hash del vettore (departure_time, route): le rotte sono identificate dal loro id nel RoutePool
+    digest = hashlib.blake2b(np.ascontiguousarray(departures).tobytes(), digest_size=16)
+    digest.update(np.ascontiguousarray(route_ids).tobytes())
+    return digest.digest()
+
+
+class FitnessCache:
+    """
+    Tabella di trasposizione delle valutazioni, indirizzata per contenuto.
+    Fitness e numero di collisioni di un individuo già visto (anche in generazioni
+    precedenti) vengono restituiti senza ricalcolarli.
+    """
+    
+    def __init__(self, max_size: int = 10000):
+        self.max_size = max_size
+        self._entries: "OrderedDict[bytes, Score]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+    
+    def get_score(self, key: bytes, compute: Callable[[], Score]) -> Score:
+        # compute produce (fitness, num_collisions) in caso di miss: il dettaglio delle collisioni
+        # non viene mai memorizzato
+        if self.max_size <= 0:
+            self.misses += 1
+            return compute()
+        
+        score = self._entries.get(key)
+        if score is not None:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return score
+        
+        self.misses += 1
+        score = compute()
+        self._entries[key] = score
+        if len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)  # Rimuove il meno usato di recente
+            self.evictions += 1
+        return score
+    
+    def lookup(self, key: bytes) -> Optional[Score]:
+        # Consulta la cache senza calcolare: None se assente (il miss viene contato da get_score)
+        score = self._entries.get(key)
+        if score is not None:
+            self._entries.move_to_end(key)
+            self.hits += 1
+        return score
+    
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+    
+    def counters(self) -> Dict[str, Any]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "size": len(self._entries),
+            "hit_rate": self.hit_rate
+        }
+    
+    def clear(self):
+        self._entries.clear()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
@@ -0,0 +1,144 @@
+import cProfile
+import json
+import time
+from contextlib import contextmanager, nullcontext
+from typing import Any, Dict, List, Optional, Tuple
+
+
+class NullInstrumentation:
+    """Strumentazione disattivata: stessa interfaccia, nessun lavoro (default del GA)."""
+    
+    enabled = False
+    _null_phase = nullcontext()
+    
+    def phase(self, name: str):
+        return self._null_phase
+    
+    def count(self, name: str, amount: int = 1):
+        pass
+    
+    def begin_generation(self, generation: int):
+        pass
+    
+    def end_generation(self, generation: int, best_fitness: float, fitness_cache=None):
+        pass
+    
+    def close(self):
+        pass
+
+
+NULL_INSTRUMENTATION = NullInstrumentation()
+
+
+class GenerationInstrumentation:
+    """
+    Tempi e numero di chiamate per fase di ogni generazione, più contatori (valutazioni
+    di fitness, invocazioni di A*). Un record per generazione viene tenuto in `records` e,
+    se indicato, aggiunto come riga JSON a jsonl_path. Con profile_generations=(da, a)
+    le generazioni dell'intervallo (estremi inclusi) vengono profilate con cProfile e
+    le statistiche salvate in profile_path.
+    Le fasi possono essere annidate: il tempo di una fase interna è incluso in quella esterna.
+    """
+    
+    enabled = True
+    
+    def __init__(
+        self,
+        jsonl_path: Optional[str] = None,
+        profile_generations: Optional[Tuple[int, int]] = None,
+        profile_path: Optional[str] = None):
+        self.jsonl_path = jsonl_path
+        self.profile_generations = profile_generations
+        if profile_generations is not None and profile_path is None:
+            profile_path = f"profile_gen{profile_generations[0]}-{profile_generations[1]}.prof"
+        self.profile_path = profile_path
+        self.records: List[Dict[str, Any]] = []
+        
+        self._sink = open(jsonl_path, "a") if jsonl_path else None
+        self._profiler: Optional[cProfile.Profile] = None
+        self._phase_times: Dict[str, float] = {}
+        self._phase_calls: Dict[str, int] = {}
+        self._counters: Dict[str, int] = {}
+        self._generation_start = 0.0
+        self._cache_snapshot = (0, 0)
+    
+    @contextmanager
+    def phase(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._phase_times[name] = self._phase_times.get(name, 0.0) + time.perf_counter() - start
+            self._phase_calls[name] = self._phase_calls.get(name, 0) + 1
+    
+    def count(self, name: str, amount: int = 1):
+        self._counters[name] = self._counters.get(name, 0) + amount
+    
+    def _in_profile_range(self, generation: int) -> bool:
+        if self.profile_generations is None:
+            return False
+        first, last = self.profile_generations
+        return first <= generation <= last
+    
+    def begin_generation(self, generation: int):
+        self._phase_times = {}
+        self._phase_calls = {}
+        self._counters = {}
+        if self._in_profile_range(generation) and self._profiler is None:
+            self._profiler = cProfile.Profile()
+            self._profiler.enable()
+        self._generation_start = time.perf_counter()
+    
+    def end_generation(self, generation: int, best_fitness: float, fitness_cache=None):
+        wall_time = time.perf_counter() - self._generation_start
+        
+        if self._profiler is not None and generation >= self.profile_generations[1]:
+            self._stop_profiler()
+        
+        record = {
+            "generation": generation,
+            "wall_time": wall_time,
+            "best_fitness": best_fitness,
+            "phases": {
+                name: {"time": self._phase_times[name], "calls": self._phase_calls[name]}
+                for name in self._phase_times
+            },
+            "counters": dict(self._counters)
+        }
+        if fitness_cache is not None:
+            # Valutazioni effettive (miss) e servite dalla cache nella generazione
+            hits, misses = fitness_cache.hits, fitness_cache.misses
+            record["counters"]["fitness_evaluations"] = misses - self._cache_snapshot[1]
+            record["counters"]["fitness_cache_hits"] = hits - self._cache_snapshot[0]
+            self._cache_snapshot = (hits, misses)
+        
+        self.records.append(record)
+        if self._sink is not None:
+            self._sink.write(json.dumps(record) + "\n")
+            self._sink.flush()
+    
+    def _stop_profiler(self):
+        self._profiler.disable()
+        self._profiler.dump_stats(self.profile_path)
+        self._profiler = None
+    
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        # Totali per fase e contatore su tutte le generazioni registrate
+        totals: Dict[str, Dict[str, float]] = {}
+        for record in self.records:
+            for name, phase in record["phases"].items():
+                total = totals.setdefault(name, {"time": 0.0, "calls": 0})
+                total["time"] += phase["time"]
+                total["calls"] += phase["calls"]
+            for name, value in record["counters"].items():
+                total = totals.setdefault(name, {"count": 0})
+                total["count"] += value
+        return totals
+    
+    def close(self):
+        # Chiude il file JSONL e salva il profilo se l'intervallo non è stato completato
+        if self._profiler is not None:
+            self._stop_profiler()
+        if self._sink is not None:
+            self._sink.close()
+            self._sink = None
@@ -1,12 +1,115 @@
-from typing import List, Tuple, Dict, Set
+import heapq
+from bisect import bisect_left, insort
+from itertools import chain
+from typing import List, Tuple, Dict, Set, Optional
+import numpy as np
 from src.environment.aircraft import Aircraft
-import config.config as config
+from config.run_config import RunConfig
 
 
-def check_collisions(aircraft_list: List[Aircraft]) -> Tuple[int, List[Tuple[int, int, int]]]:
+def _flatten_routes(aircraft_list: List[Aircraft]):
+    # (lunghezze, coordinate (n, 2), partenze) delle rotte di una lista di Aircraft
+    lengths = np.fromiter((len(a.route) for a in aircraft_list), dtype=np.int64, count=len(aircraft_list))
+    total = int(lengths.sum())
+    coords = np.fromiter(
+        chain.from_iterable(chain.from_iterable(a.route for a in aircraft_list)),
+        dtype=np.int64,
+        count=2 * total
+    ).reshape(-1, 2)
+    departures = np.fromiter((a.departure_time for a in aircraft_list), dtype=np.int64, count=len(aircraft_list))
+    return lengths, coords, departures
+
+
+def _encode_occupancy(lengths: np.ndarray, coords: np.ndarray, departures: np.ndarray, horizon: int):
+    # Codifica piatta (tick, cella) di tutte le posizioni occupate entro l'orizzonte.
+    # coords contiene le rotte concatenate nell'ordine degli aerei, lengths le loro lunghezze.
+    # Ritorna (chiavi, indice_aereo, celle_per_tick): chiave = tick * celle_per_tick + cella.
+    total = len(coords)
+    if total == 0:
+        empty = np.empty(0, dtype=np.int64)
+        return empty, empty, 1
+    
+    owner = np.repeat(np.arange(len(lengths), dtype=np.int64), lengths)
+    offsets = np.cumsum(lengths) - lengths
+    ticks = np.repeat(departures - offsets, lengths) + np.arange(total, dtype=np.int64)
+    
+    in_horizon = (ticks >= 0) & (ticks < horizon)
+    coords = coords[in_horizon]
+    owner = owner[in_horizon]
+    ticks = ticks[in_horizon]
+    if len(ticks) == 0:
+        return ticks, owner, 1
+    
+    rows = int(coords[:, 0].max()) + 1
+    cols = int(coords[:, 1].max()) + 1
+    keys = (ticks * rows + coords[:, 0]) * cols + coords[:, 1]
+    return keys, owner, rows * cols
+
+
+def _collisions_from_encoding(
+    keys: np.ndarray,
+    owner: np.ndarray,
+    cells_per_tick: int,
+    ids: np.ndarray
+) -> Tuple[int, List[Tuple[int, int, int]]]:
+    # Coppie di aerei nella stessa (tick, cella), nello stesso ordine di _check_collisions_loop:
+    # per tick, poi per primo aereo arrivato nella cella, poi coppie (i, j) con i < j.
+    if len(keys) < 2:
+        return 0, []
+    
+    # Un solo ordinamento per valore di chiave * aerei + indice_aereo (valori distinti):
+    # molto più rapido di un argsort stabile e dà lo stesso ordine (cella, poi aereo)
+    num_aircraft = len(ids)
+    combined = np.sort(keys * num_aircraft + owner)
+    sorted_keys = combined // num_aircraft
+    
+    boundaries = np.flatnonzero(sorted_keys[1:] != sorted_keys[:-1]) + 1
+    group_start = np.concatenate(([0], boundaries))
+    group_size = np.diff(np.concatenate((group_start, [len(sorted_keys)])))
+    colliding = group_size > 1
+    if not colliding.any():
+        return 0, []
+    group_start = group_start[colliding]
+    group_size = group_size[colliding]
+    
+    sorted_owner = combined - sorted_keys * num_aircraft
+    group_ticks = sorted_keys[group_start] // cells_per_tick
+    group_order = np.lexsort((sorted_owner[group_start], group_ticks))
+    group_start = group_start[group_order]
+    group_size = group_size[group_order]
+    group_ticks = group_ticks[group_order]
+    
+    # Coppie generate per dimensione di gruppo con triu_indices, poi riordinate per gruppo
+    first_parts, second_parts, rank_parts = [], [], []
+    for size in np.unique(group_size).tolist():
+        groups = np.flatnonzero(group_size == size)
+        i, j = np.triu_indices(size, 1)
+        first_parts.append((group_start[groups][:, None] + i).ravel())
+        second_parts.append((group_start[groups][:, None] + j).ravel())
+        rank_parts.append(np.repeat(groups, len(i)))
+    ranks = np.concatenate(rank_parts)
+    pair_order = np.argsort(ranks, kind='stable')
+    first = np.concatenate(first_parts)[pair_order]
+    second = np.concatenate(second_parts)[pair_order]
+    
+    pair_ticks = group_ticks[ranks[pair_order]]
+    collisions_detail = list(zip(
+        pair_ticks.tolist(),
+        ids[sorted_owner[first]].tolist(),
+        ids[sorted_owner[second]].tolist()
+    ))
+    return len(collisions_detail), collisions_detail
+
+
+def _check_collisions_loop(
+    aircraft_list: List[Aircraft],
+    run_config: Optional[RunConfig] = None
+) -> Tuple[int, List[Tuple[int, int, int]]]:
+    # Implementazione di riferimento tick per tick (lenta, usata per confronto)
+    run_config = run_config or RunConfig.from_module()
     collisions_detail = []
     
-    for t in range(config.MAX_SIMULATION_TIME):
+    for t in range(run_config.max_simulation_time):
         positions: Dict[Tuple[int, int], List[int]] = {}
         
         for aircraft in aircraft_list:
@@ -25,6 +128,91 @@ def check_collisions(aircraft_list: List[Aircraft]) -> Tuple[int, List[Tuple[int
     return len(collisions_detail), collisions_detail
 
 
+def _check_collisions_sweep(
+    aircraft_list: List[Aircraft],
+    run_config: Optional[RunConfig] = None
+) -> Tuple[int, List[Tuple[int, int, int]]]:
+    # Sweep-line sugli intervalli di volo [partenza, arrivo]: si visitano solo i tick con
+    # almeno due aerei in volo e solo gli aerei attivi. L'orizzonte finisce con l'ultimo arrivo
+    # (limitato a max_simulation_time), il costo cresce con i passi di volo e non con flotta x orizzonte.
+    run_config = run_config or RunConfig.from_module()
+    horizon = run_config.max_simulation_time
+    
+    intervals = []
+    for index, aircraft in enumerate(aircraft_list):
+        if not aircraft.route:
+            continue
+        first = max(aircraft.departure_time, 0)
+        last = min(aircraft.departure_time + len(aircraft.route) - 1, horizon - 1)
+        if first <= last:
+            intervals.append((first, last, index))
+    if len(intervals) < 2:
+        return 0, []
+    intervals.sort()
+    
+    routes = [aircraft.route for aircraft in aircraft_list]
+    departures = [aircraft.departure_time for aircraft in aircraft_list]
+    ids = [aircraft.id for aircraft in aircraft_list]
+    
+    active: List[int] = []  # Aerei in volo, nell'ordine della lista (come l'implementazione tick per tick)
+    arrivals: List[Tuple[int, int]] = []  # Heap (ultimo tick, aereo)
+    collisions_detail = []
+    next_interval = 0
+    t = intervals[0][0]
+    
+    while True:
+        while arrivals and arrivals[0][0] < t:
+            _, index = heapq.heappop(arrivals)
+            del active[bisect_left(active, index)]
+        while next_interval < len(intervals) and intervals[next_interval][0] <= t:
+            _, last, index = intervals[next_interval]
+            insort(active, index)
+            heapq.heappush(arrivals, (last, index))
+            next_interval += 1
+        
+        if len(active) < 2:
+            # Nessuna collisione possibile fino alla prossima partenza
+            if next_interval == len(intervals):
+                break
+            t = intervals[next_interval][0]
+            continue
+        
+        positions: Dict[Tuple[int, int], List[int]] = {}
+        for index in active:
+            pos = routes[index][t - departures[index]]
+            if pos in positions:
+                positions[pos].append(ids[index])
+            else:
+                positions[pos] = [ids[index]]
+        
+        if len(positions) < len(active):
+            for aircraft_ids in positions.values():
+                if len(aircraft_ids) > 1:
+                    for i in range(len(aircraft_ids)):
+                        for j in range(i + 1, len(aircraft_ids)):
+                            collisions_detail.append((t, aircraft_ids[i], aircraft_ids[j]))
+        t += 1
+    
+    return len(collisions_detail), collisions_detail
+
+
+def check_collisions(
+    aircraft_list: List[Aircraft],
+    run_config: Optional[RunConfig] = None
+) -> Tuple[int, List[Tuple[int, int, int]]]:
+    # Senza run_config si usano i valori correnti del modulo config.
+    # run_config.collision_detection sceglie l'implementazione; il risultato è lo stesso.
+    run_config = run_config or RunConfig.from_module()
+    if run_config.collision_detection == "sweep":
+        return _check_collisions_sweep(aircraft_list, run_config)
+    if run_config.collision_detection == "loop":
+        return _check_collisions_loop(aircraft_list, run_config)
+    
+    keys, owner, cells_per_tick = _encode_occupancy(*_flatten_routes(aircraft_list), run_config.max_simulation_time)
+    ids = np.array([aircraft.id for aircraft in aircraft_list], dtype=np.int64)
+    return _collisions_from_encoding(keys, owner, cells_per_tick, ids)
+
+
 def calculate_completion_time(aircraft_list: List[Aircraft]) -> int:
     max_time = 0
     for aircraft in aircraft_list:
@@ -34,16 +222,12 @@ def calculate_completion_time(aircraft_list: List[Aircraft]) -> int:
     return max_time
 
 
-def calculate_fitness(
-    aircraft_list: List[Aircraft],
+def combine_fitness(
+    completion_time: int,
+    avg_departure_delay: float,
+    num_collisions: int,
     collision_penalty: float = 10000.0
 ) -> float:
-    num_collisions, _ = check_collisions(aircraft_list)
-    
-    completion_time = calculate_completion_time(aircraft_list)
-    total_departure_delay = sum(aircraft.departure_time for aircraft in aircraft_list)
-    avg_departure_delay = total_departure_delay / config.NUM_AIRCRAFT
-    
     fitness = -(completion_time + avg_departure_delay)
     
     if num_collisions > 0:
@@ -52,12 +236,30 @@ def calculate_fitness(
     return fitness
 
 
-def get_solution_statistics(aircraft_list: List[Aircraft]) -> Dict:
-    num_collisions, collisions_detail = check_collisions(aircraft_list)
+def calculate_fitness(
+    aircraft_list: List[Aircraft],
+    collision_penalty: float = 10000.0,
+    num_collisions: Optional[int] = None,
+    run_config: Optional[RunConfig] = None
+) -> float:
+    run_config = run_config or RunConfig.from_module()
+    if num_collisions is None:
+        num_collisions, _ = check_collisions(aircraft_list, run_config)
+    
+    completion_time = calculate_completion_time(aircraft_list)
+    total_departure_delay = sum(aircraft.departure_time for aircraft in aircraft_list)
+    avg_departure_delay = total_departure_delay / run_config.num_aircraft
+    
+    return combine_fitness(completion_time, avg_departure_delay, num_collisions, collision_penalty)
+
+
+def get_solution_statistics(aircraft_list: List[Aircraft], run_config: Optional[RunConfig] = None) -> Dict:
+    run_config = run_config or RunConfig.from_module()
+    num_collisions, collisions_detail = check_collisions(aircraft_list, run_config)
     completion_time = calculate_completion_time(aircraft_list)
     total_departure_delay = sum(aircraft.departure_time for aircraft in aircraft_list)
     avg_departure_delay = total_departure_delay / len(aircraft_list) if aircraft_list else 0
-    fitness = calculate_fitness(aircraft_list)
+    fitness = calculate_fitness(aircraft_list, num_collisions=num_collisions, run_config=run_config)
     
     return {
         "num_aircraft": len(aircraft_list),
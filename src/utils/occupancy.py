@@ -0,0 +1,136 @@
+from collections import Counter
+from typing import Dict, List, Optional, Sequence, Set, Tuple
+from src.environment.grid import Grid
+from src.utils.metrics import combine_fitness
+
+
+class OccupancyTable:
+    """
+    Tabella delle prenotazioni spazio-temporali di un individuo: {t * num_cells + cella: (id, ...)}.
+    La chiave coincide con la codifica degli stati di astar_path_temporal, che la interroga
+    direttamente. Prenotare o rilasciare la traiettoria di un aereo costa O(lunghezza rotta);
+    numero di collisioni e tempo di completamento sono mantenuti in modo incrementale.
+    """
+    
+    def __init__(self, grid: Grid, horizon: int, num_aircraft: int):
+        # horizon e num_aircraft (denominatore del ritardo medio nella fitness) vengono dalla RunConfig della run
+        self.num_cells = grid.num_cells
+        self.cols = grid.cols
+        self.horizon = horizon
+        self.num_aircraft = num_aircraft
+        self._cells: Dict[int, Tuple[int, ...]] = {}
+        self._trajectories: Dict[int, Tuple[int, Sequence[Tuple[int, int]]]] = {}  # id -> (partenza, rotta)
+        self._conflicts: Set[int] = set()  # celle con 2+ aerei entro l'orizzonte
+        self._arrivals: Counter = Counter()
+        self._completion_time: Optional[int] = 0
+        self.num_collisions = 0
+        self.total_departure_delay = 0
+    
+    def copy(self) -> "OccupancyTable":
+        # Le tuple di occupanti sono immutabili: basta una copia superficiale dei dizionari
+        table = OccupancyTable.__new__(OccupancyTable)
+        table.num_cells = self.num_cells
+        table.cols = self.cols
+        table.horizon = self.horizon
+        table.num_aircraft = self.num_aircraft
+        table._cells = self._cells.copy()
+        table._trajectories = self._trajectories.copy()
+        table._conflicts = self._conflicts.copy()
+        table._arrivals = self._arrivals.copy()
+        table._completion_time = self._completion_time
+        table.num_collisions = self.num_collisions
+        table.total_departure_delay = self.total_departure_delay
+        return table
+    
+    def __len__(self) -> int:
+        return len(self._trajectories)
+    
+    @property
+    def reserved_states(self) -> Dict[int, Tuple[int, ...]]:
+        # Vista in sola lettura per le query O(1) di astar_path_temporal
+        return self._cells
+    
+    def trajectory(self, aircraft_id: int) -> Tuple[int, Sequence[Tuple[int, int]]]:
+        return self._trajectories[aircraft_id]
+    
+    def reserve(self, aircraft_id: int, departure: int, route: Sequence[Tuple[int, int]]):
+        if aircraft_id in self._trajectories:
+            raise ValueError(f"Aereo {aircraft_id} già presente nella tabella di occupazione")
+        
+        self._trajectories[aircraft_id] = (departure, route)
+        self.total_departure_delay += departure
+        
+        cells = self._cells
+        num_cells = self.num_cells
+        cols = self.cols
+        for t_idx, (row, col) in enumerate(route):
+            t = departure + t_idx
+            key = t * num_cells + row * cols + col
+            occupants = cells.get(key)
+            if occupants is None:
+                cells[key] = (aircraft_id,)
+                continue
+            cells[key] = occupants + (aircraft_id,)
+            if t < self.horizon:
+                self.num_collisions += len(occupants)
+                self._conflicts.add(key)
+        
+        if route:
+            arrival = departure + len(route) - 1
+            self._arrivals[arrival] += 1
+            if self._completion_time is not None and arrival > self._completion_time:
+                self._completion_time = arrival
+    
+    def release(self, aircraft_id: int):
+        departure, route = self._trajectories.pop(aircraft_id)
+        self.total_departure_delay -= departure
+        
+        cells = self._cells
+        num_cells = self.num_cells
+        cols = self.cols
+        for t_idx, (row, col) in enumerate(route):
+            t = departure + t_idx
+            key = t * num_cells + row * cols + col
+            occupants = cells[key]
+            if len(occupants) == 1:
+                del cells[key]
+                continue
+            remaining = tuple(aid for aid in occupants if aid != aircraft_id)
+            cells[key] = remaining
+            if t < self.horizon:
+                self.num_collisions -= len(remaining)
+                if len(remaining) == 1:
+                    self._conflicts.discard(key)
+        
+        if route:
+            arrival = departure + len(route) - 1
+            self._arrivals[arrival] -= 1
+            if self._arrivals[arrival] == 0:
+                del self._arrivals[arrival]
+                if arrival == self._completion_time:
+                    self._completion_time = None  # Ricalcolato alla prossima lettura
+    
+    def update(self, aircraft_id: int, departure: int, route: Sequence[Tuple[int, int]]):
+        # Riallinea la tabella dopo una modifica di rotta o tempo di partenza
+        self.release(aircraft_id)
+        self.reserve(aircraft_id, departure, route)
+    
+    @property
+    def completion_time(self) -> int:
+        if self._completion_time is None:
+            self._completion_time = max(self._arrivals, default=0)
+        return self._completion_time
+    
+    def colliding_aircraft(self) -> List[int]:
+        aircraft_ids = set()
+        for key in self._conflicts:
+            aircraft_ids.update(self._cells[key])
+        return sorted(aircraft_ids)
+    
+    def fitness(self, collision_penalty: float = 10000.0) -> float:
+        avg_departure_delay = self.total_departure_delay / self.num_aircraft
+        return combine_fitness(self.completion_time, avg_departure_delay, self.num_collisions, collision_penalty)
+    
+    def score(self) -> Tuple[float, int]:
+        # (fitness, num_collisions): quanto serve al GA, senza costruire il dettaglio delle collisioni
+        return self.fitness(), self.num_collisions
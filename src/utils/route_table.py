@@ -0,0 +1,170 @@
+import hashlib
+import json
+import os
+from typing import Dict, Iterable, List, Optional, Tuple
+import numpy as np
+from src.environment.airport import Airport
+from src.environment.grid import Grid
+from src.utils.a_star import astar_path, distance_field
+
+Route = Tuple[Tuple[int, int], ...]
+
+
+class RouteTable:
+    """
+    Percorsi minimi A* tra coppie di aeroporti, calcolati una sola volta per ambiente.
+    Le rotte sono tuple immutabili condivise da tutti gli individui.
+    """
+    
+    def __init__(self, grid: Grid, airports: List[Airport]):
+        self.grid = grid
+        self.airports = airports
+        self._routes: Dict[Tuple[int, int], Route] = {}
+        self._distance_fields: Dict[int, List[float]] = {}
+        # Array caricati da un file di scenario (vedi attach_arrays): decodificati solo quando richiesti
+        self._stored: Optional[Dict[str, np.ndarray]] = None
+        self._stored_fields: Dict[int, int] = {}
+    
+    def __len__(self) -> int:
+        return len(self._routes)
+    
+    def route(self, start_airport_id: int, destination_airport_id: int) -> Route:
+        key = (start_airport_id, destination_airport_id)
+        route = self._routes.get(key)
+        if route is None and self._stored is not None:
+            route = self._stored_route(start_airport_id, destination_airport_id)
+        if route is None:
+            start = self.airports[start_airport_id].position
+            goal = self.airports[destination_airport_id].position
+            path = astar_path(self.grid, start, goal)
+            if path is None:
+                raise ValueError(f"Impossibile trovare un percorso da {start} a {goal}")
+            route = tuple(tuple(pos) for pos in path)
+            self._routes[key] = route
+        return route
+    
+    def distance_field(self, airport_id: int) -> List[float]:
+        # Distanza minima di ogni cella dall'aeroporto (euristica esatta per astar_path_temporal)
+        field = self._distance_fields.get(airport_id)
+        if field is None and airport_id in self._stored_fields:
+            field = self._stored["distance_fields"][self._stored_fields[airport_id]].tolist()
+            self._distance_fields[airport_id] = field
+        if field is None:
+            field = distance_field(self.grid, self.airports[airport_id].position)
+            self._distance_fields[airport_id] = field
+        return field
+    
+    def precompute(self, pairs: Optional[Iterable[Tuple[int, int]]] = None):
+        # Senza argomenti calcola tutte le coppie ordinate di aeroporti
+        if pairs is None:
+            pairs = (
+                (start.id, destination.id)
+                for start in self.airports
+                for destination in self.airports
+                if start.id != destination.id
+            )
+        for start_id, destination_id in pairs:
+            self.route(start_id, destination_id)
+    
+    def to_arrays(self) -> Dict[str, np.ndarray]:
+        # Rappresentazione compatta per i file di scenario: celle delle rotte come indici piatti
+        # concatenati, route_index[start * num_airports + destinazione] = riga in route_offsets (-1 se assente)
+        if self._stored is not None:
+            self.precompute(self._stored_pairs())
+        num_airports = len(self.airports)
+        pairs = sorted(self._routes)
+        route_index = np.full(num_airports * num_airports, -1, dtype=np.int64)
+        offsets = np.zeros(len(pairs) + 1, dtype=np.int64)
+        cells = []
+        cols = self.grid.cols
+        for row, (start_id, destination_id) in enumerate(pairs):
+            route = self._routes[(start_id, destination_id)]
+            route_index[start_id * num_airports + destination_id] = row
+            offsets[row + 1] = offsets[row] + len(route)
+            cells.extend(r * cols + c for r, c in route)
+        
+        for airport_id in self._stored_fields:
+            self.distance_field(airport_id)
+        field_airports = sorted(self._distance_fields)
+        fields = np.array([self._distance_fields[airport_id] for airport_id in field_airports], dtype=np.float64)
+        
+        return {
+            "route_index": route_index,
+            "route_offsets": offsets,
+            "route_cells": np.array(cells, dtype=np.int32),
+            "distance_field_airports": np.array(field_airports, dtype=np.int32),
+            "distance_fields": fields.reshape(len(field_airports), self.grid.num_cells)
+        }
+    
+    def attach_arrays(self, arrays: Dict[str, np.ndarray]):
+        # Usa gli array di to_arrays (tipicamente mappati in memoria) come sorgente delle rotte
+        self._stored = arrays
+        self._stored_fields = {
+            airport_id: row for row, airport_id in enumerate(arrays["distance_field_airports"].tolist())
+        }
+    
+    def _stored_route(self, start_airport_id: int, destination_airport_id: int) -> Optional[Route]:
+        row = int(self._stored["route_index"][start_airport_id * len(self.airports) + destination_airport_id])
+        if row < 0:
+            return None
+        begin, end = self._stored["route_offsets"][row:row + 2].tolist()
+        positions = self.grid.positions
+        route = tuple(positions[cell] for cell in self._stored["route_cells"][begin:end].tolist())
+        self._routes[(start_airport_id, destination_airport_id)] = route
+        return route
+    
+    def _stored_pairs(self) -> List[Tuple[int, int]]:
+        num_airports = len(self.airports)
+        return [divmod(int(key), num_airports) for key in np.flatnonzero(np.asarray(self._stored["route_index"]) >= 0)]
+    
+    def layout_key(self) -> str:
+        # Identifica griglia e disposizione degli aeroporti per il salvataggio su disco
+        layout = {
+            'grid_size': self.grid.size,
+            'airports': [list(airport.position) for airport in self.airports]
+        }
+        return hashlib.sha1(json.dumps(layout).encode()).hexdigest()[:16]
+    
+    def cache_path(self, cache_dir: str) -> str:
+        return os.path.join(cache_dir, f"routes_grid{self.grid.size}_{self.layout_key()}.json")
+    
+    def save(self, cache_dir: str) -> str:
+        os.makedirs(cache_dir, exist_ok=True)
+        data = {
+            'grid_size': self.grid.size,
+            'layout_key': self.layout_key(),
+            'routes': [[start_id, destination_id, route] for (start_id, destination_id), route in self._routes.items()]
+        }
+        filename = self.cache_path(cache_dir)
+        # Scrittura atomica: processi concorrenti non leggono mai un file parziale
+        temp_filename = f"{filename}.{os.getpid()}.tmp"
+        with open(temp_filename, 'w') as f:
+            json.dump(data, f)
+        os.replace(temp_filename, filename)
+        return filename
+    
+    def load(self, cache_dir: str) -> bool:
+        filename = self.cache_path(cache_dir)
+        if not os.path.exists(filename):
+            return False
+        
+        with open(filename, 'r') as f:
+            data = json.load(f)
+        
+        if data.get('layout_key') != self.layout_key():
+            return False
+        
+        for start_id, destination_id, route in data['routes']:
+            self._routes[(start_id, destination_id)] = tuple(tuple(pos) for pos in route)
+        return True
+    
+    @classmethod
+    def build(cls, grid: Grid, airports: List[Airport], cache_dir: Optional[str] = None) -> "RouteTable":
+        table = cls(grid, airports)
+        if cache_dir is not None and table.load(cache_dir):
+            return table
+        
+        table.precompute()
+        if cache_dir is not None:
+            table.save(cache_dir)
+        return table
@@ -1,6 +1,11 @@
 import json
+import lzma
 import os
-from typing import List, Dict, Any
+import struct
+import zlib
+from collections import OrderedDict
+from collections.abc import Mapping
+from typing import Callable, Iterator, List, Dict, Any, Optional, Tuple
 from src.environment.aircraft import Aircraft
 
 
@@ -39,47 +44,549 @@ def deserialize_solution(data: List[Dict[str, Any]]) -> List[Aircraft]:
     return [deserialize_aircraft(aircraft_data) for aircraft_data in data]
 
 
-def save_simulation(seed: int, generations_data: Dict[int, List[Aircraft]], 
-                   airports_data: List[Dict], grid_size: int, 
-                   fitness_history: List[float], output_dir: str = "output"):
-    if not os.path.exists(output_dir):
-        os.makedirs(output_dir)
+# Formato compatto delle simulazioni (.pcsim): magic, un byte con il codec di compressione, la
+# lunghezza dell'header (uint64) e l'header compresso, seguito da blocchi JSON compressi uno per uno.
+# L'header contiene i metadati (seed, aeroporti, fitness) e l'indice dei blocchi: campi statici degli
+# aerei, dizionario delle rotte (celle come indici piatti) in blocchi aggiunti man mano e uno snapshot
+# per generazione (id di rotta + tempi di partenza). Ogni snapshot è un keyframe completo oppure un
+# delta che elenca solo gli aerei cambiati rispetto al precedente. All'apertura si legge solo l'header.
+# I JSON legacy restano leggibili: vengono caricati in memoria senza essere convertiti.
+SIMULATION_MAGIC = b"PCSIMv3\n"
+SIMULATION_EXTENSION = ".pcsim"
+LEGACY_EXTENSION = ".json"
+LOG_EXTENSION = ".pcslog"
+SIMULATION_EXTENSIONS = (SIMULATION_EXTENSION, LOG_EXTENSION, LEGACY_EXTENSION)  # In ordine di preferenza
+COMPRESSION_CODECS = {None: 0, "zlib": 1, "lzma": 2}
+KEYFRAME_INTERVAL = 16  # Uno snapshot completo ogni KEYFRAME_INTERVAL, gli altri come delta
+_HEADER_LENGTH = struct.Struct("<Q")
+
+
+def _compress(data: bytes, compression: Optional[str]) -> bytes:
+    if compression == "zlib":
+        return zlib.compress(data, 6)
+    if compression == "lzma":
+        return lzma.compress(data)
+    return data
+
+
+def _decompress(data: bytes, codec: int) -> bytes:
+    if codec == COMPRESSION_CODECS["zlib"]:
+        return zlib.decompress(data)
+    if codec == COMPRESSION_CODECS["lzma"]:
+        return lzma.decompress(data)
+    return data
+
+
+def _static_fields(aircraft: Aircraft) -> List:
+    return [aircraft.id, aircraft.start_airport_id, aircraft.destination_airport_id,
+            list(aircraft.start_position), list(aircraft.destination_position)]
+
+
+class SnapshotEncoder:
+    """
+    Codifica incrementale degli snapshot: rotte internate in un dizionario, campi statici
+    degli aerei registrati al primo snapshot, keyframe ogni KEYFRAME_INTERVAL e delta negli altri.
+    """
     
-    # Serializza tutte le generazioni
-    serialized_generations = {}
-    for gen_num, aircraft_list in generations_data.items():
-        serialized_generations[str(gen_num)] = serialize_solution(aircraft_list)
+    def __init__(self, grid_size: int, skip_identical: bool = False):
+        self.grid_size = grid_size
+        self.skip_identical = skip_identical  # Non codifica snapshot identici al precedente
+        self.route_ids: Dict[Tuple, int] = {}
+        self.routes: List[List[int]] = []
+        self.static: Optional[List] = None
+        self.count = 0
+        self._previous_routes: List[int] = []
+        self._previous_departures: List[int] = []
+    
+    def encode(self, gen_num: int, aircraft_list: List[Aircraft]) -> Optional[Dict[str, Any]]:
+        fields = [_static_fields(aircraft) for aircraft in aircraft_list]
+        if self.static is None:
+            self.static = fields
+        elif fields != self.static:
+            raise ValueError(f"Gli aerei della generazione {gen_num} non corrispondono a quelli degli snapshot precedenti")
+        
+        current_routes = []
+        for aircraft in aircraft_list:
+            key = tuple(aircraft.route)
+            route_id = self.route_ids.get(key)
+            if route_id is None:
+                route_id = self.route_ids[key] = len(self.routes)
+                self.routes.append([row * self.grid_size + col for row, col in key])
+            current_routes.append(route_id)
+        current_departures = [aircraft.departure_time for aircraft in aircraft_list]
+        
+        if self.count > 0:
+            changed = [i for i in range(len(aircraft_list))
+                       if current_routes[i] != self._previous_routes[i]
+                       or current_departures[i] != self._previous_departures[i]]
+            if not changed and self.skip_identical:
+                return None
+        
+        if self.count % KEYFRAME_INTERVAL == 0:
+            snapshot = {'generation': gen_num, 'route_ids': current_routes, 'departures': current_departures}
+        else:
+            snapshot = {
+                'generation': gen_num,
+                'changed': changed,
+                'route_ids': [current_routes[i] for i in changed],
+                'departures': [current_departures[i] for i in changed]
+            }
+        self.count += 1
+        self._previous_routes, self._previous_departures = current_routes, current_departures
+        return snapshot
+
+
+class SnapshotDecoder:
+    """
+    Inverso di SnapshotEncoder: applica keyframe e delta nell'ordine in cui sono stati scritti.
+    Le rotte (indici piatti) vengono convertite in coordinate solo quando servono.
+    """
+    
+    def __init__(self, grid_size: int, static: List, routes: Optional[List[List[int]]] = None,
+                 route_cache: Optional[Dict[int, List[Tuple[int, int]]]] = None):
+        self.grid_size = grid_size
+        self.static = static
+        self.routes = routes if routes is not None else []
+        self._route_cache = route_cache if route_cache is not None else {}
+        self._route_ids: List[int] = []
+        self._departures: List[int] = []
+    
+    def add_routes(self, routes: List[List[int]]):
+        self.routes.extend(routes)
+    
+    def _route(self, route_id: int) -> List[Tuple[int, int]]:
+        route = self._route_cache.get(route_id)
+        if route is None:
+            route = [divmod(cell, self.grid_size) for cell in self.routes[route_id]]
+            self._route_cache[route_id] = route
+        return route
+    
+    def apply(self, snapshot: Dict[str, Any]):
+        if 'changed' in snapshot:
+            for i, route_id, departure in zip(snapshot['changed'], snapshot['route_ids'], snapshot['departures']):
+                self._route_ids[i] = route_id
+                self._departures[i] = departure
+        else:
+            self._route_ids = list(snapshot['route_ids'])
+            self._departures = list(snapshot['departures'])
+    
+    def materialize(self) -> List[Aircraft]:
+        aircraft_list = []
+        for (aircraft_id, start_id, destination_id, start, destination), route_id, departure in zip(
+                self.static, self._route_ids, self._departures):
+            aircraft = Aircraft(aircraft_id, start_id, destination_id, tuple(start), tuple(destination))
+            aircraft.route = list(self._route(route_id))
+            aircraft.departure_time = departure
+            aircraft_list.append(aircraft)
+        return aircraft_list
+    
+    def decode(self, snapshot: Dict[str, Any]) -> List[Aircraft]:
+        self.apply(snapshot)
+        return self.materialize()
+
+
+GENERATION_CACHE_SIZE = 8  # Generazioni decodificate tenute in memoria da LazyGenerations
+
+
+class LazyGenerations(Mapping):
+    """
+    Generazioni di una simulazione come mapping {generazione: lista di Aircraft}: l'indice è
+    costruito all'apertura, gli aerei vengono materializzati solo all'accesso e le ultime
+    cache_size generazioni decodificate restano in una LRU.
+    """
+    
+    def __init__(self, generations: List[int], materialize: Callable[[int], List[Aircraft]],
+                 cache_size: int = GENERATION_CACHE_SIZE):
+        # materialize riceve la posizione della generazione nell'indice
+        self._generations = list(generations)
+        self._positions = {generation: position for position, generation in enumerate(self._generations)}
+        self._materialize = materialize
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[int, List[Aircraft]]" = OrderedDict()
+    
+    def __getitem__(self, generation: int) -> List[Aircraft]:
+        aircraft_list = self._cache.get(generation)
+        if aircraft_list is not None:
+            self._cache.move_to_end(generation)
+            return aircraft_list
+        
+        position = self._positions.get(generation)
+        if position is None:
+            raise KeyError(generation)
+        aircraft_list = self._materialize(position)
+        self._cache[generation] = aircraft_list
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        return aircraft_list
+    
+    def __contains__(self, generation) -> bool:
+        return generation in self._positions
+    
+    def __iter__(self) -> Iterator[int]:
+        return iter(self._generations)
+    
+    def __len__(self) -> int:
+        return len(self._generations)
+
+
+class _DeltaSnapshots:
+    """Materializza una generazione ripartendo dal keyframe più vicino che la precede."""
+    
+    def __init__(self, grid_size: int, keyframes: List[bool], snapshot: Callable[[int], Dict[str, Any]],
+                 static: Callable[[], List], routes: Callable[[int], List[List[int]]]):
+        self.grid_size = grid_size
+        self.keyframes = keyframes
+        self.snapshot = snapshot  # posizione -> snapshot codificato
+        self.static = static
+        self.routes = routes  # posizione -> dizionario delle rotte valido fino a quello snapshot
+        self._route_cache: Dict[int, List[Tuple[int, int]]] = {}
+    
+    def materialize(self, position: int) -> List[Aircraft]:
+        start = position
+        while not self.keyframes[start]:
+            start -= 1
+        decoder = SnapshotDecoder(self.grid_size, self.static(), self.routes(position), self._route_cache)
+        for current in range(start, position + 1):
+            decoder.apply(self.snapshot(current))
+        return decoder.materialize()
+
+
+class _SnapshotIndex:
+    """
+    Indice dei blocchi compressi di un file di snapshot (.pcsim o .pcslog): per ogni snapshot
+    generazione, tipo, posizione nel file e numero di blocchi di rotte che lo precedono.
+    Snapshot, rotte e campi statici vengono letti e decompressi solo quando servono.
+    """
+    
+    def __init__(self, filename: str):
+        self.filename = filename
+        self.codec = COMPRESSION_CODECS[None]
+        self.grid_size = 0
+        self.generations: List[int] = []
+        self.keyframes: List[bool] = []
+        self._snapshot_records: List[Tuple[int, int]] = []  # (offset, lunghezza) del JSON compresso
+        self._routes_before: List[int] = []  # Blocchi di rotte che precedono ogni snapshot
+        self._route_records: List[Tuple[int, int]] = []
+        self._static_record: Optional[Tuple[int, int]] = None
+        self._static: Optional[List] = None
+        self._routes: List[List[int]] = []
+        self._loaded_route_records = 0
+    
+    def _add_snapshot(self, generation: int, keyframe: bool, record: Tuple[int, int]):
+        self.generations.append(generation)
+        self.keyframes.append(keyframe)
+        self._snapshot_records.append(record)
+        self._routes_before.append(len(self._route_records))
+    
+    def _read_json(self, record: Tuple[int, int]):
+        offset, length = record
+        with open(self.filename, 'rb') as f:
+            f.seek(offset)
+            payload = f.read(length)
+        return json.loads(_decompress(payload, self.codec))
+    
+    def static(self) -> List:
+        if self._static is None:
+            self._static = self._read_json(self._static_record) if self._static_record is not None else []
+        return self._static
+    
+    def routes(self, position: int) -> List[List[int]]:
+        # Dizionario delle rotte esteso quanto basta per lo snapshot in posizione position
+        while self._loaded_route_records < self._routes_before[position]:
+            self._routes.extend(self._read_json(self._route_records[self._loaded_route_records]))
+            self._loaded_route_records += 1
+        return self._routes
+    
+    def snapshot(self, position: int) -> Dict[str, Any]:
+        return self._read_json(self._snapshot_records[position])
+    
+    def lazy_generations(self, cache_size: int = GENERATION_CACHE_SIZE) -> LazyGenerations:
+        source = _DeltaSnapshots(self.grid_size, self.keyframes, self.snapshot, self.static, self.routes)
+        return LazyGenerations(self.generations, source.materialize, cache_size)
+
+
+# Log append-only degli snapshot (.pcslog), scritto durante l'evoluzione: magic seguito da record
+# [lunghezza uint32][tipo 1 byte][payload]. Tipi:
+#   H header (JSON)                  A campi statici degli aerei (JSON compresso, prima del primo snapshot)
+#   R rotte nuove (JSON compresso)   K/S keyframe/delta (generazione uint32 + JSON compresso)
+#   F fitness di una generazione (generazione uint32 + double)
+# Generazione e tipo sono leggibili senza decomprimere: all'apertura basta scorrere le intestazioni.
+# Ogni record viene scritto con flush: il file è leggibile a run in corso e un record troncato da
+# un crash viene ignorato.
+LOG_MAGIC = b"PCSLOGv2"
+_RECORD_HEADER = struct.Struct("<IB")
+_GENERATION = struct.Struct("<I")
+_FITNESS_RECORD = struct.Struct("<Id")
+
+
+class SnapshotLog:
+    """Sink degli snapshot del GA: ogni snapshot e ogni valore di fitness vengono accodati al log."""
     
-    simulation_data = {
+    def __init__(self, path: str, seed: int, grid_size: int, airports_data: List[Dict],
+                 compression: Optional[str] = "zlib"):
+        if compression not in COMPRESSION_CODECS:
+            raise ValueError(f"Compressione non supportata: {compression}")
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        
+        self.path = path
+        self.compression = compression
+        self.encoder = SnapshotEncoder(grid_size, skip_identical=True)
+        self.skipped = 0  # Snapshot non scritti perché identici al precedente
+        self._written_routes = 0
+        self._file = open(path, 'wb')
+        self._file.write(LOG_MAGIC)
+        self._write_record(b'H', json.dumps({
+            'seed': seed,
+            'grid_size': grid_size,
+            'airports': airports_data,
+            'compression': compression
+        }).encode())
+    
+    def _write_record(self, record_type: bytes, payload: bytes):
+        self._file.write(_RECORD_HEADER.pack(len(payload), record_type[0]))
+        self._file.write(payload)
+        self._file.flush()
+    
+    def _compressed_json(self, data) -> bytes:
+        return _compress(json.dumps(data, separators=(',', ':')).encode(), self.compression)
+    
+    def write_snapshot(self, generation: int, aircraft_list: List[Aircraft]) -> bool:
+        # Ritorna False se lo snapshot è identico al precedente e quindi non è stato scritto
+        snapshot = self.encoder.encode(generation, aircraft_list)
+        if snapshot is None:
+            self.skipped += 1
+            return False
+        
+        if self.encoder.count == 1:
+            self._write_record(b'A', self._compressed_json(self.encoder.static))
+        if len(self.encoder.routes) > self._written_routes:
+            self._write_record(b'R', self._compressed_json(self.encoder.routes[self._written_routes:]))
+            self._written_routes = len(self.encoder.routes)
+        
+        record_type = b'S' if 'changed' in snapshot else b'K'
+        self._write_record(record_type, _GENERATION.pack(generation) + self._compressed_json(snapshot))
+        return True
+    
+    def write_fitness(self, generation: int, fitness: float):
+        self._write_record(b'F', _FITNESS_RECORD.pack(generation, fitness))
+    
+    def close(self):
+        if not self._file.closed:
+            self._file.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class SnapshotLogReader(_SnapshotIndex):
+    """
+    Indice di un log di snapshot: all'apertura legge solo le intestazioni dei record (posizione,
+    tipo, generazione) e i valori di fitness; snapshot e rotte vengono letti dal file su richiesta.
+    Vede i record completi presenti al momento dell'apertura, anche di una run ancora in corso.
+    """
+    
+    def __init__(self, filename: str):
+        super().__init__(filename)
+        self.header: Optional[Dict[str, Any]] = None
+        self.fitness_history: List[float] = []
+        self._scan()
+    
+    def _scan(self):
+        size = os.path.getsize(self.filename)
+        with open(self.filename, 'rb') as f:
+            if f.read(len(LOG_MAGIC)) != LOG_MAGIC:
+                raise ValueError(f"{self.filename} non è un log di snapshot valido")
+            position = len(LOG_MAGIC)
+            while position + _RECORD_HEADER.size <= size:
+                f.seek(position)
+                length, record_type = _RECORD_HEADER.unpack(f.read(_RECORD_HEADER.size))
+                start = position + _RECORD_HEADER.size
+                if start + length > size:
+                    break  # Record incompleto in coda
+                position = start + length
+                
+                if record_type == ord('H'):
+                    self.header = json.loads(f.read(length))
+                    self.codec = COMPRESSION_CODECS[self.header['compression']]
+                    self.grid_size = self.header['grid_size']
+                elif record_type == ord('F'):
+                    self.fitness_history.append(_FITNESS_RECORD.unpack(f.read(length))[1])
+                elif record_type == ord('A'):
+                    self._static_record = (start, length)
+                elif record_type == ord('R'):
+                    self._route_records.append((start, length))
+                elif record_type in (ord('K'), ord('S')):
+                    (generation,) = _GENERATION.unpack(f.read(_GENERATION.size))
+                    self._add_snapshot(generation, record_type == ord('K'),
+                                       (start + _GENERATION.size, length - _GENERATION.size))
+        
+        if self.header is None:
+            raise ValueError(f"{self.filename} non contiene l'header del log")
+    
+    def to_simulation(self, cache_size: int = GENERATION_CACHE_SIZE) -> Dict[str, Any]:
+        return {
+            'seed': self.header['seed'],
+            'grid_size': self.header['grid_size'],
+            'airports': self.header['airports'],
+            'generations': self.lazy_generations(cache_size),
+            'fitness_history': self.fitness_history,
+            'available_generations': sorted(self.generations)
+        }
+
+
+class SimulationFileReader(_SnapshotIndex):
+    """Indice di un file .pcsim: all'apertura legge solo l'header con metadati e posizioni dei blocchi."""
+    
+    def __init__(self, filename: str):
+        super().__init__(filename)
+        with open(filename, 'rb') as f:
+            if f.read(len(SIMULATION_MAGIC)) != SIMULATION_MAGIC:
+                raise ValueError(f"{filename} non è un file di simulazione valido")
+            self.codec = f.read(1)[0]
+            (header_length,) = _HEADER_LENGTH.unpack(f.read(_HEADER_LENGTH.size))
+            self.header: Dict[str, Any] = json.loads(_decompress(f.read(header_length), self.codec))
+        
+        data_start = len(SIMULATION_MAGIC) + 1 + _HEADER_LENGTH.size + header_length
+        self.grid_size = self.header['grid_size']
+        offset, length = self.header['aircraft']
+        self._static_record = (data_start + offset, length)
+        for generation, keyframe, offset, length, routes_before in self.header['snapshots']:
+            self.generations.append(generation)
+            self.keyframes.append(keyframe)
+            self._snapshot_records.append((data_start + offset, length))
+            self._routes_before.append(routes_before)
+        self._route_records = [(data_start + offset, length) for offset, length in self.header['routes']]
+    
+    def to_simulation(self, cache_size: int = GENERATION_CACHE_SIZE) -> Dict[str, Any]:
+        return {
+            'seed': self.header['seed'],
+            'grid_size': self.grid_size,
+            'airports': self.header['airports'],
+            'generations': self.lazy_generations(cache_size),
+            'fitness_history': self.header['fitness_history'],
+            'available_generations': self.header['available_generations']
+        }
+
+
+def read_snapshot_log(filename: str, cache_size: int = GENERATION_CACHE_SIZE) -> Dict[str, Any]:
+    # Stessa struttura di load_simulation; le generazioni vengono decodificate all'accesso
+    return SnapshotLogReader(filename).to_simulation(cache_size)
+
+
+def simulation_path(seed: int, output_dir: str = "output") -> Optional[str]:
+    # File della simulazione con questo seed: formato compatto se presente, altrimenti JSON legacy
+    for extension in SIMULATION_EXTENSIONS:
+        filename = os.path.join(output_dir, f"simulation_seed{seed}{extension}")
+        if os.path.exists(filename):
+            return filename
+    return None
+
+
+def _write_simulation_file(filename: str, metadata: Dict[str, Any], static: List, route_chunks: List[List[List[int]]],
+                           snapshots: List[Tuple[Dict[str, Any], int]], compression: Optional[str]):
+    # snapshots: (snapshot codificato, blocchi di rotte che lo precedono). Scrittura atomica su file temporaneo.
+    blocks = []
+    offset = 0
+    
+    def add_block(data) -> List[int]:
+        nonlocal offset
+        block = _compress(json.dumps(data, separators=(',', ':')).encode(), compression)
+        blocks.append(block)
+        offset += len(block)
+        return [offset - len(block), len(block)]
+    
+    header = {
+        **metadata,
+        'aircraft': add_block(static),
+        'routes': [add_block(chunk) for chunk in route_chunks],
+        'snapshots': [[snapshot['generation'], 'changed' not in snapshot, *add_block(snapshot), routes_before]
+                      for snapshot, routes_before in snapshots]
+    }
+    header_data = _compress(json.dumps(header, separators=(',', ':')).encode(), compression)
+    
+    temp_file = f"{filename}.{os.getpid()}.tmp"
+    with open(temp_file, 'wb') as f:
+        f.write(SIMULATION_MAGIC)
+        f.write(bytes([COMPRESSION_CODECS[compression]]))
+        f.write(_HEADER_LENGTH.pack(len(header_data)))
+        f.write(header_data)
+        for block in blocks:
+            f.write(block)
+    os.replace(temp_file, filename)
+
+
+def _write_generations(filename: str, seed: int, generations_data: Dict[int, List[Aircraft]],
+                       airports_data: List[Dict], grid_size: int, fitness_history: List[float],
+                       compression: Optional[str]):
+    encoder = SnapshotEncoder(grid_size)
+    route_chunks = []
+    snapshots = []
+    written_routes = 0
+    for gen_num in sorted(generations_data):
+        snapshot = encoder.encode(gen_num, generations_data[gen_num])
+        if len(encoder.routes) > written_routes:
+            route_chunks.append(encoder.routes[written_routes:])
+            written_routes = len(encoder.routes)
+        snapshots.append((snapshot, len(route_chunks)))
+    
+    metadata = {
         'seed': seed,
         'grid_size': grid_size,
         'airports': airports_data,
-        'generations': serialized_generations,
         'fitness_history': fitness_history,
-        'available_generations': sorted([int(k) for k in serialized_generations.keys()])
+        'available_generations': sorted(generations_data.keys())
     }
+    _write_simulation_file(filename, metadata, encoder.static or [], route_chunks, snapshots, compression)
+
+
+def save_simulation(seed: int, generations_data: Dict[int, List[Aircraft]], 
+                   airports_data: List[Dict], grid_size: int, 
+                   fitness_history: List[float], output_dir: str = "output",
+                   compression: Optional[str] = "zlib"):
+    # compression: "zlib", "lzma" oppure None
+    if compression not in COMPRESSION_CODECS:
+        raise ValueError(f"Compressione non supportata: {compression}")
+    if not os.path.exists(output_dir):
+        os.makedirs(output_dir)
     
-    filename = os.path.join(output_dir, f"simulation_seed{seed}.json")
-    with open(filename, 'w') as f:
-        json.dump(simulation_data, f, indent=2)
+    filename = os.path.join(output_dir, f"simulation_seed{seed}{SIMULATION_EXTENSION}")
+    _write_generations(filename, seed, generations_data, airports_data, grid_size, fitness_history, compression)
     
     print(f"\nSimulazione salvata in: {filename}")
     return filename
 
 
-def load_simulation(seed: int, output_dir: str = "output") -> Dict[str, Any]:
-    filename = os.path.join(output_dir, f"simulation_seed{seed}.json")
-    
-    if not os.path.exists(filename):
-        raise FileNotFoundError(f"Simulazione con seed {seed} non trovata in {output_dir}")
-    
+def _load_legacy(filename: str, cache_size: int) -> Dict[str, Any]:
+    # Il JSON resta in memoria com'è: gli Aircraft di una generazione vengono creati solo all'accesso
     with open(filename, 'r') as f:
         data = json.load(f)
     
-    # Deserializza le generazioni
-    generations = {}
-    for gen_num_str, aircraft_data in data['generations'].items():
-        generations[int(gen_num_str)] = deserialize_solution(aircraft_data)
+    solutions = {int(gen_num_str): solution for gen_num_str, solution in data['generations'].items()}
+    generations = sorted(solutions)
+    data['generations'] = LazyGenerations(
+        generations, lambda position: deserialize_solution(solutions[generations[position]]), cache_size
+    )
+    return data
+
+
+def load_simulation(seed: int, output_dir: str = "output", cache_size: int = GENERATION_CACHE_SIZE) -> Dict[str, Any]:
+    # 'generations' è un LazyGenerations: gli aerei di una generazione vengono creati al primo accesso
+    filename = simulation_path(seed, output_dir)
+    
+    if filename is None:
+        raise FileNotFoundError(f"Simulazione con seed {seed} non trovata in {output_dir}")
+    
+    if filename.endswith(LEGACY_EXTENSION):
+        data = _load_legacy(filename, cache_size)
+    elif filename.endswith(LOG_EXTENSION):
+        data = read_snapshot_log(filename, cache_size)
+    else:
+        data = SimulationFileReader(filename).to_simulation(cache_size)
     
     # Converte tuple negli aeroporti
     airports = []
@@ -91,23 +598,34 @@ def load_simulation(seed: int, output_dir: str = "output") -> Dict[str, Any]:
         'seed': data['seed'],
         'grid_size': data['grid_size'],
         'airports': airports,
-        'generations': generations,
+        'generations': data['generations'],
         'fitness_history': data['fitness_history'],
         'available_generations': data['available_generations']
     }
 
 
+def delete_simulation(seed: int, output_dir: str = "output") -> List[str]:
+    # Elimina i file della simulazione (in qualsiasi formato) e ritorna i percorsi eliminati
+    removed = []
+    for extension in SIMULATION_EXTENSIONS:
+        filename = os.path.join(output_dir, f"simulation_seed{seed}{extension}")
+        if os.path.exists(filename):
+            os.remove(filename)
+            removed.append(filename)
+    return removed
+
+
 def list_available_simulations(output_dir: str = "output") -> List[int]:
     if not os.path.exists(output_dir):
         return []
     
-    seeds = []
+    seeds = set()
     for filename in os.listdir(output_dir):
-        if filename.startswith("simulation_seed") and filename.endswith(".json"):
-            try:
-                seed = int(filename.replace("simulation_seed", "").replace(".json", ""))
-                seeds.append(seed)
-            except ValueError:
-                continue
+        for extension in SIMULATION_EXTENSIONS:
+            if filename.startswith("simulation_seed") and filename.endswith(extension):
+                try:
+                    seeds.add(int(filename[len("simulation_seed"):-len(extension)]))
+                except ValueError:
+                    continue
     
     return sorted(seeds)
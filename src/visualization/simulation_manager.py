@@ -1,4 +1,6 @@
+from itertools import chain
 from typing import List, Tuple, Dict, Optional
+import numpy as np
 from src.environment.aircraft import Aircraft
 from src.utils.metrics import check_collisions
 
@@ -16,6 +18,9 @@ class SimulationManager:
         
         # Calcola tick massimo effettivo (quando l'ultimo aereo arriva)
         self._calculate_max_tick()
+        
+        # Posizioni, aerei in volo e in collisione per ogni tick: le query per frame diventano slice
+        self._precompute_frames()
     
     def _precompute_collisions(self):
         _, collisions_detail = check_collisions(self.aircraft_list)
@@ -35,10 +40,61 @@ class SimulationManager:
                 max_tick = max(max_tick, arrival_tick)
         self.effective_max_tick = min(max_tick + 10, self.max_time)  # +10 per vedere dopo l'arrivo
     
+    def _precompute_frames(self):
+        # positions[tick, i] = (riga, colonna) dell'aereo i-esimo della lista, (-1, -1) se non in volo
+        num_ticks = self.effective_max_tick + 1
+        num_aircraft = len(self.aircraft_list)
+        self.aircraft_ids = np.array([aircraft.id for aircraft in self.aircraft_list], dtype=np.int64)
+        self.positions = np.full((num_ticks, num_aircraft, 2), -1, dtype=np.int32)
+        
+        lengths = np.fromiter((len(a.route) for a in self.aircraft_list), dtype=np.int64, count=num_aircraft)
+        total = int(lengths.sum())
+        if total > 0:
+            coords = np.fromiter(
+                chain.from_iterable(chain.from_iterable(a.route for a in self.aircraft_list)),
+                dtype=np.int64,
+                count=2 * total
+            ).reshape(-1, 2)
+            departures = np.fromiter((a.departure_time for a in self.aircraft_list), dtype=np.int64, count=num_aircraft)
+            owner = np.repeat(np.arange(num_aircraft), lengths)
+            ticks = np.repeat(departures - (np.cumsum(lengths) - lengths), lengths) + np.arange(total)
+            visible = (ticks >= 0) & (ticks < num_ticks)
+            self.positions[ticks[visible], owner[visible]] = coords[visible]
+        
+        self.active = self.positions[:, :, 0] >= 0
+        self.active_counts = self.active.sum(axis=1)
+        
+        self.in_collision = np.zeros((num_ticks, num_aircraft), dtype=bool)
+        index_of = {aircraft.id: i for i, aircraft in enumerate(self.aircraft_list)}
+        for tick, pairs in self.collisions_by_tick.items():
+            if tick < num_ticks:
+                for aid1, aid2 in pairs:
+                    self.in_collision[tick, index_of[aid1]] = True
+                    self.in_collision[tick, index_of[aid2]] = True
+        
+        self.total_departure_delay = sum(aircraft.departure_time for aircraft in self.aircraft_list)
+    
+    def get_frame(self, tick: int) -> Tuple[List[int], List[List[int]], List[bool]]:
+        """
+        Aerei in volo al tick: (indici nella lista, posizioni [riga, colonna], in collisione)
+        """
+        if not 0 <= tick < len(self.positions):
+            return [], [], []
+        indices = np.flatnonzero(self.active[tick])
+        return indices.tolist(), self.positions[tick, indices].tolist(), self.in_collision[tick, indices].tolist()
+    
+    def get_active_count(self, tick: int) -> int:
+        if not 0 <= tick < len(self.active_counts):
+            return 0
+        return int(self.active_counts[tick])
+    
     def get_aircraft_positions(self, tick: int) -> Dict[int, Optional[Tuple[int, int]]]:
-        positions = {}
-        for aircraft in self.aircraft_list:
-            positions[aircraft.id] = aircraft.get_position_at_time(tick)
+        if not 0 <= tick < len(self.positions):
+            return {aircraft.id: aircraft.get_position_at_time(tick) for aircraft in self.aircraft_list}
+        positions = dict.fromkeys(self.aircraft_ids.tolist())
+        indices, frame_positions, _ = self.get_frame(tick)
+        for index, (row, col) in zip(indices, frame_positions):
+            positions[self.aircraft_list[index].id] = (row, col)
         return positions
     
     def get_collisions_at_tick(self, tick: int) -> List[Tuple[int, int]]:
@@ -48,12 +104,9 @@ class SimulationManager:
         """
         Ritorna il set di ID degli aerei in collisione al tick specificato
         """
-        collisions = self.get_collisions_at_tick(tick)
-        aircraft_ids = set()
-        for aid1, aid2 in collisions:
-            aircraft_ids.add(aid1)
-            aircraft_ids.add(aid2)
-        return aircraft_ids
+        if not 0 <= tick < len(self.in_collision):
+            return set()
+        return set(self.aircraft_ids[self.in_collision[tick]].tolist())
     
     def next_tick(self):
         """Avanza al tick successivo"""
@@ -109,9 +162,7 @@ class SimulationManager:
         ]
         
         # Conta aerei attivi al tick corrente
-        positions = self.get_aircraft_positions(self.current_tick)
-        active_count = sum(1 for pos in positions.values() if pos is not None)
-        lines.append(f"Aerei in volo: {active_count}")
+        lines.append(f"Aerei in volo: {self.get_active_count(self.current_tick)}")
         
         # Collisioni al tick corrente
         collisions = self.get_collisions_at_tick(self.current_tick)
@@ -0,0 +1,63 @@
+from src.environment.grid import Grid, WAIT_COST
+from src.utils.a_star import AStarStats, astar_path_temporal, distance_field
+from src.utils.occupancy import OccupancyTable
+
+
+def blocked_corridor(grid: Grid, reserved_ticks: range) -> OccupancyTable:
+    # Un aereo fermo su ogni cella della colonna 2 per tutti i tick indicati: il muro separa start e goal
+    table = OccupancyTable(grid, 50, grid.size)
+    for row in range(grid.size):
+        table.reserve(row, reserved_ticks.start, [(row, 2)] * len(reserved_ticks))
+    return table
+
+
+def test_status_found():
+    grid = Grid(5)
+    path, status = astar_path_temporal(grid, (0, 0), (4, 4), 0, {}, max_time=50, max_expansions=1000,
+                                       return_status=True)
+    assert status == "found"
+    assert path[0] == (0, 0) and path[-1] == (4, 4)
+
+
+def test_status_budget_differs_from_no_path():
+    grid = Grid(5)
+    path, status = astar_path_temporal(grid, (0, 0), (4, 4), 0, {}, max_time=50, max_expansions=2,
+                                       return_status=True)
+    assert path is None and status == "budget"
+
+
+def test_status_horizon():
+    grid = Grid(5)
+    path, status = astar_path_temporal(grid, (0, 0), (0, 4), 0, {}, max_time=2, max_expansions=1000,
+                                       return_status=True)
+    assert path is None and status == "horizon"
+
+
+def test_status_unreachable():
+    grid = Grid(5)
+    for row in range(5):
+        grid.set_obstacle((row, 2))
+    field = distance_field(grid, (0, 4))
+    stats = AStarStats()
+    path, status = astar_path_temporal(grid, (0, 0), (0, 4), 0, {}, heuristic_field=field, max_time=50,
+                                       max_expansions=1000, stats=stats, return_status=True)
+    assert path is None and status == "unreachable" == stats.status
+
+
+def test_status_recorded_without_return_status():
+    grid = Grid(5)
+    stats = AStarStats()
+    assert astar_path_temporal(grid, (0, 0), (4, 4), 0, {}, max_time=50, max_expansions=2, stats=stats) is None
+    assert stats.status == "budget"
+
+
+def test_wait_move_precomputed():
+    # Il muro temporaneo sulla colonna 2 obbliga ad aspettare: con allow_wait l'attesa è una mossa sul posto
+    grid = Grid(5)
+    table = blocked_corridor(grid, range(0, 6))
+    path, status = astar_path_temporal(grid, (2, 0), (2, 4), 0, table, allow_wait=True, max_time=20,
+                                       max_expansions=10000, return_status=True)
+    assert status == "found" and path[-1] == (2, 4)
+    assert any(a == b for a, b in zip(path, path[1:]))
+    assert grid.neighbors_with_wait[7][-1] == (7, WAIT_COST)
+    assert grid.neighbors_with_wait[7][:-1] == grid.neighbors[7]
@@ -0,0 +1,30 @@
+import random
+
+from config.run_config import RunConfig
+from src.algorithms.island_model import IslandModel
+from src.environment.environment import Environment
+
+
+def test_islands_with_parallel_evaluation_config():
+    # Le isole sono processi daemon: evaluation_workers > 1 non deve far creare pool al loro interno
+    run_config = RunConfig(
+        grid_size=10,
+        num_airports=4,
+        min_airport_distance=2,
+        num_aircraft=8,
+        max_simulation_time=60,
+        population_size=24,
+        tournament_size=4,
+        max_generations=4,
+        evaluation_workers=2
+    )
+    random.seed(7)
+    environment = Environment(run_config=run_config)
+    
+    model = IslandModel(environment, num_islands=2, migration_interval=2, migration_size=1, seed=7,
+                        run_config=run_config)
+    best, histories = model.run()
+    
+    assert best is not None and len(best) == run_config.num_aircraft
+    assert len(histories) == 2
+    assert all(len(history) >= 2 for history in histories)
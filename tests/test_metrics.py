@@ -0,0 +1,39 @@
+import random
+import pytest
+
+from config.run_config import RunConfig
+from src.environment.aircraft import Aircraft
+from src.utils.metrics import check_collisions, _check_collisions_loop, _check_collisions_sweep
+
+
+def random_fleet(rng: random.Random, grid_size: int, num_aircraft: int, max_departure: int):
+    # Flotta casuale su una griglia piccola: molte collisioni, anche tra più di due aerei
+    fleet = []
+    for aircraft_id in rng.sample(range(10 * num_aircraft + 1), num_aircraft):
+        aircraft = Aircraft(aircraft_id, 0, 1, (0, 0), (1, 1))
+        aircraft.set_route([(rng.randrange(grid_size), rng.randrange(grid_size))
+                            for _ in range(rng.randint(0, 25))])
+        aircraft.set_departure_time(rng.randint(-5, max_departure))
+        fleet.append(aircraft)
+    return fleet
+
+
+@pytest.mark.parametrize("seed", range(40))
+def test_check_collisions_matches_loop(seed):
+    rng = random.Random(seed)
+    fleet = random_fleet(rng, rng.randint(2, 8), rng.randint(0, 60), 40)
+    run_config = RunConfig(max_simulation_time=rng.randint(1, 60))
+    
+    expected = _check_collisions_loop(fleet, run_config)
+    assert check_collisions(fleet, run_config) == expected
+    assert _check_collisions_sweep(fleet, run_config) == expected
+    assert check_collisions(fleet, run_config.replace(collision_detection="sweep")) == expected
+
+
+def test_no_collisions_on_disjoint_routes():
+    fleet = []
+    for aircraft_id in range(5):
+        aircraft = Aircraft(aircraft_id, 0, 1, (aircraft_id, 0), (aircraft_id, 4))
+        aircraft.set_route([(aircraft_id, col) for col in range(5)])
+        fleet.append(aircraft)
+    assert check_collisions(fleet, RunConfig()) == (0, [])
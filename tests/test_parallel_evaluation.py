@@ -0,0 +1,31 @@
+import random
+
+from config.run_config import RunConfig
+from src.algorithms.genetic_algorithm import GeneticAlgorithm
+from src.environment.environment import Environment
+
+
+def run_ga(workers: int):
+    run_config = RunConfig(
+        grid_size=10,
+        num_airports=4,
+        min_airport_distance=2,
+        num_aircraft=16,
+        max_simulation_time=80,
+        population_size=24,
+        tournament_size=4,
+        max_generations=6
+    )
+    random.seed(3)
+    environment = Environment(run_config=run_config)
+    ga = GeneticAlgorithm(environment, seed=3, workers=workers, chunk_size=4, verbose=False, run_config=run_config)
+    best, history = ga.evolve()
+    return history, [(aircraft.departure_time, list(aircraft.route)) for aircraft in best]
+
+
+def test_parallel_matches_serial():
+    # Ripianificazione e valutazione nei worker devono dare la stessa evoluzione del modo seriale
+    serial_history, serial_best = run_ga(workers=1)
+    parallel_history, parallel_best = run_ga(workers=2)
+    assert parallel_history == serial_history
+    assert parallel_best == serial_best
@@ -0,0 +1,42 @@
+import random
+
+import numpy as np
+import pytest
+
+from config.run_config import RunConfig
+from src.algorithms.genetic_algorithm import GeneticAlgorithm
+from src.environment.environment import Environment
+
+RUN_CONFIG = RunConfig(
+    grid_size=12,
+    num_airports=4,
+    min_airport_distance=2,
+    num_aircraft=12,
+    max_simulation_time=80,
+    population_size=20,
+    tournament_size=4,
+    max_generations=5
+)
+
+
+def run_ga(environment: Environment):
+    ga = GeneticAlgorithm(environment, seed=5, verbose=False, run_config=RUN_CONFIG)
+    best, history = ga.evolve()
+    return history, [(aircraft.departure_time, list(aircraft.route)) for aircraft in best]
+
+
+@pytest.mark.parametrize("distance_fields", [False, True])
+def test_scenario_roundtrip_gives_same_ga_result(tmp_path, distance_fields):
+    random.seed(4)
+    environment = Environment(run_config=RUN_CONFIG)
+    path = environment.save_scenario(str(tmp_path / "scenario.npz"), distance_fields=distance_fields)
+    
+    loaded = Environment(run_config=RUN_CONFIG, scenario_path=path)
+    assert np.array_equal(loaded.grid.grid, environment.grid.grid)
+    assert [airport.position for airport in loaded.airports] == [airport.position for airport in environment.airports]
+    assert ([(a.id, a.start_position, a.destination_position) for a in loaded.aircraft]
+            == [(a.id, a.start_position, a.destination_position) for a in environment.aircraft])
+    
+    # Le rotte del GA vengono dalla tabella salvata nel file, non ricalcolate
+    assert loaded._route_table is not None
+    assert run_ga(loaded) == run_ga(environment)
@@ -0,0 +1,139 @@
+import copy
+import json
+import random
+
+import pytest
+
+from src.environment.aircraft import Aircraft
+from src.utils import serialization as ser
+
+GRID_SIZE = 12
+AIRPORTS = [{'id': 0, 'position': [0, 0], 'aircraft_count': 1}]
+
+
+def random_generations(seed: int, num_aircraft: int = 15, num_generations: int = 40):
+    # Generazioni successive in cui poche rotte cambiano: keyframe, delta e snapshot identici
+    rng = random.Random(seed)
+    current = []
+    for aircraft_id in range(num_aircraft):
+        aircraft = Aircraft(aircraft_id, aircraft_id % 3, (aircraft_id + 1) % 3, (0, 0), (1, 1))
+        aircraft.route = [(rng.randrange(GRID_SIZE), rng.randrange(GRID_SIZE)) for _ in range(rng.randint(2, 10))]
+        aircraft.departure_time = rng.randint(0, 5)
+        current.append(aircraft)
+    
+    generations = {}
+    for generation in range(num_generations):
+        current = [copy.copy(aircraft) for aircraft in current]
+        for aircraft in rng.sample(current, rng.choice([0, 1, 3])):
+            aircraft.route = [(rng.randrange(GRID_SIZE), rng.randrange(GRID_SIZE)) for _ in range(rng.randint(2, 10))]
+            aircraft.departure_time = rng.randint(0, 5)
+        generations[generation] = current
+    return generations
+
+
+def assert_same_generations(loaded, generations):
+    available = loaded['available_generations']
+    for generation in list(reversed(available)) + available:
+        assert (ser.serialize_solution(loaded['generations'][generation])
+                == ser.serialize_solution(generations[generation]))
+
+
+@pytest.mark.parametrize("compression", [None, "zlib", "lzma"])
+def test_save_load_roundtrip(tmp_path, compression):
+    generations = random_generations(1)
+    history = [float(-generation) for generation in generations]
+    ser.save_simulation(7, generations, AIRPORTS, GRID_SIZE, history, str(tmp_path), compression)
+    
+    loaded = ser.load_simulation(7, str(tmp_path), cache_size=3)
+    assert loaded['available_generations'] == sorted(generations)
+    assert loaded['fitness_history'] == history
+    assert_same_generations(loaded, generations)
+    assert len(loaded['generations']._cache) == 3
+
+
+def test_open_reads_only_index(tmp_path):
+    generations = random_generations(2)
+    filename = ser.save_simulation(8, generations, AIRPORTS, GRID_SIZE, [], str(tmp_path))
+    
+    reader = ser.SimulationFileReader(filename)
+    assert reader._static is None and reader._loaded_route_records == 0
+    reader.lazy_generations()[5]
+    assert reader._loaded_route_records == reader._routes_before[5] < len(reader._route_records)
+
+
+def test_legacy_json_read_without_writing(tmp_path):
+    generations = random_generations(4)
+    data = {
+        'seed': 10, 'grid_size': GRID_SIZE, 'airports': AIRPORTS, 'fitness_history': [2.0],
+        'available_generations': sorted(generations),
+        'generations': {str(generation): ser.serialize_solution(solution) for generation, solution in generations.items()}
+    }
+    (tmp_path / "simulation_seed10.json").write_text(json.dumps(data))
+    
+    # La cartella di output può essere di sola lettura: il caricamento non deve creare file
+    loaded = ser.load_simulation(10, str(tmp_path), cache_size=3)
+    assert loaded['fitness_history'] == [2.0]
+    assert_same_generations(loaded, generations)
+    assert len(loaded['generations']._cache) == 3
+    assert [path.name for path in tmp_path.iterdir()] == ["simulation_seed10.json"]
+
+
+
+def write_log(log: ser.SnapshotLog, generations, selected) -> list:
+    # Fitness e snapshot di ogni generazione selezionata; ritorna le generazioni effettivamente scritte
+    written = []
+    for generation in selected:
+        log.write_fitness(generation, float(generation))
+        if log.write_snapshot(generation, generations[generation]):
+            written.append(generation)
+    return written
+
+
+def test_snapshot_log_roundtrip_skips_identical(tmp_path):
+    generations = random_generations(5)
+    with ser.SnapshotLog(str(tmp_path / "simulation_seed11.pcslog"), 11, GRID_SIZE, AIRPORTS) as log:
+        written = write_log(log, generations, sorted(generations))
+    
+    assert log.skipped > 0 and len(written) + log.skipped == len(generations)
+    loaded = ser.load_simulation(11, str(tmp_path))
+    assert loaded['fitness_history'] == [float(generation) for generation in sorted(generations)]
+    assert loaded['available_generations'] == written
+    assert_same_generations(loaded, generations)
+
+
+def test_snapshot_log_truncated_last_record(tmp_path):
+    # Un crash a metà scrittura lascia un record incompleto in coda: viene ignorato
+    generations = random_generations(6)
+    path = tmp_path / "simulation_seed12.pcslog"
+    with ser.SnapshotLog(str(path), 12, GRID_SIZE, AIRPORTS) as log:
+        written = write_log(log, generations, sorted(generations))
+    data = path.read_bytes()
+    assert written[-1] == max(generations)  # L'ultimo record è uno snapshot
+    
+    path.write_bytes(data[:-3])
+    loaded = ser.read_snapshot_log(str(path))
+    assert loaded['available_generations'] == written[:-1]
+    assert len(loaded['fitness_history']) == len(generations)
+    assert_same_generations(loaded, generations)
+    
+    # Troncato dentro l'intestazione del record
+    path.write_bytes(data + ser._RECORD_HEADER.pack(100, ord('S'))[:3])
+    assert ser.read_snapshot_log(str(path))['available_generations'] == written
+
+
+def test_snapshot_log_readable_while_writing(tmp_path):
+    generations = random_generations(7)
+    path = str(tmp_path / "simulation_seed13.pcslog")
+    order = sorted(generations)
+    with ser.SnapshotLog(path, 13, GRID_SIZE, AIRPORTS) as log:
+        written = write_log(log, generations, order[:10])
+        partial = ser.read_snapshot_log(path)
+        assert partial['available_generations'] == written
+        assert len(partial['fitness_history']) == 10
+        assert_same_generations(partial, generations)
+        
+        written += write_log(log, generations, order[10:])
+        complete = ser.read_snapshot_log(path)
+        assert complete['available_generations'] == written
+        assert len(complete['fitness_history']) == len(generations)
+        assert_same_generations(complete, generations)
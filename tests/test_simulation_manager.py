@@ -0,0 +1,49 @@
+import random
+from typing import Dict, List, Set, Tuple
+
+import pytest
+
+from src.environment.aircraft import Aircraft
+from src.visualization.simulation_manager import SimulationManager
+
+
+def random_fleet(rng: random.Random, grid_size: int, num_aircraft: int) -> List[Aircraft]:
+    # Griglia piccola e partenze ravvicinate: molte collisioni; id non consecutivi e rotte anche vuote
+    fleet = []
+    for aircraft_id in rng.sample(range(10 * num_aircraft + 1), num_aircraft):
+        aircraft = Aircraft(aircraft_id, 0, 1, (0, 0), (1, 1))
+        aircraft.set_route([(rng.randrange(grid_size), rng.randrange(grid_size))
+                            for _ in range(rng.randint(0, 25))])
+        aircraft.set_departure_time(rng.randint(0, 30))
+        fleet.append(aircraft)
+    return fleet
+
+
+def reference_frame(fleet: List[Aircraft], tick: int) -> Tuple[Dict[int, Tuple[int, int]], Set[int]]:
+    # Posizioni e aerei in collisione al tick calcolati aereo per aereo con get_position_at_time
+    positions = {aircraft.id: aircraft.get_position_at_time(tick) for aircraft in fleet}
+    occupants: Dict[Tuple[int, int], List[int]] = {}
+    for aircraft_id, pos in positions.items():
+        if pos is not None:
+            occupants.setdefault(pos, []).append(aircraft_id)
+    in_collision = {aircraft_id for ids in occupants.values() if len(ids) > 1 for aircraft_id in ids}
+    return positions, in_collision
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_frames_match_position_at_time(seed):
+    rng = random.Random(seed)
+    fleet = random_fleet(rng, rng.randint(2, 6), rng.randint(1, 40))
+    manager = SimulationManager(fleet)
+    
+    for tick in range(-2, manager.effective_max_tick + 5):
+        positions, in_collision = reference_frame(fleet, tick)
+        assert manager.get_aircraft_positions(tick) == positions
+        assert manager.get_aircraft_in_collision(tick) == in_collision
+        
+        indices, frame_positions, frame_collisions = manager.get_frame(tick)
+        ids = [fleet[index].id for index in indices]
+        assert ids == [aircraft.id for aircraft in fleet if positions[aircraft.id] is not None]
+        assert [tuple(pos) for pos in frame_positions] == [positions[aircraft_id] for aircraft_id in ids]
+        assert frame_collisions == [aircraft_id in in_collision for aircraft_id in ids]
+        assert manager.get_active_count(tick) == len(ids)
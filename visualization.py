@@ -5,7 +5,9 @@ import os
 from typing import Optional
 from src.environment.environment import Environment
 from src.algorithms.genetic_algorithm import GeneticAlgorithm
-from src.utils.serialization import save_simulation, load_simulation, list_available_simulations
+from src.utils.serialization import (
+    load_simulation, list_available_simulations, delete_simulation, SnapshotLog, LOG_EXTENSION
+)
 from src.visualization.renderer import Renderer
 from src.visualization.ui_components import Button, Dropdown, InfoPanel
 from src.visualization.simulation_manager import SimulationManager
@@ -43,13 +45,11 @@ class VisualizationApp:
     
     def cleanup_simulation_files(self):
         if self.current_seed is not None:
-            filename = os.path.join("output", f"simulation_seed{self.current_seed}.json")
-            if os.path.exists(filename):
-                try:
-                    os.remove(filename)
+            try:
+                for filename in delete_simulation(self.current_seed, "output"):
                     print(f"\nFile di simulazione eliminato: {filename}")
-                except Exception as e:
-                    print(f"\nErrore durante l'eliminazione del file: {e}")
+            except Exception as e:
+                print(f"\nErrore durante l'eliminazione del file: {e}")
     
     def show_startup_menu(self) -> tuple:
         font = pygame.font.SysFont('Arial', 20)
@@ -122,8 +122,17 @@ class VisualizationApp:
         random.seed(seed)
         env = Environment()
         
-        ga = GeneticAlgorithm(env, seed=seed, save_snapshots=True, snapshot_interval=5)
-        best_solution, fitness_history = ga.evolve()
+        airports_data = [
+            {'id': airport.id, 'position': airport.position}
+            for airport in env.airports
+        ]
+        
+        # Gli snapshot vengono scritti sul log durante l'evoluzione
+        delete_simulation(seed, "output")
+        log_path = os.path.join("output", f"simulation_seed{seed}{LOG_EXTENSION}")
+        with SnapshotLog(log_path, seed, env.grid.size, airports_data) as sink:
+            ga = GeneticAlgorithm(env, seed=seed, save_snapshots=True, snapshot_interval=5, snapshot_sink=sink)
+            best_solution, fitness_history = ga.evolve()
         
         from src.utils.metrics import calculate_completion_time
         from config.config import NUM_AIRCRAFT
@@ -144,21 +153,7 @@ class VisualizationApp:
         print(f"                = {ga.best_fitness:.2f}")
         print(f"{'='*60}")
         
-        airports_data = [
-            {'id': airport.id, 'position': airport.position}
-            for airport in env.airports
-        ]
-        
-        save_simulation(
-            seed=seed,
-            generations_data=ga.snapshots,
-            airports_data=airports_data,
-            grid_size=env.grid.size,
-            fitness_history=fitness_history,
-            output_dir="output"
-        )
-        
-        print(f"\nSimulazione completata e salvata!")
+        print(f"\nSimulazione completata e salvata in: {log_path}")
     
     def load_simulation_data(self, seed: int):
         try:
@@ -273,14 +268,11 @@ class VisualizationApp:
         
         # 4. Disegna aerei
         current_tick = self.simulation_manager.current_tick
-        positions = self.simulation_manager.get_aircraft_positions(current_tick)
-        aircraft_in_collision = self.simulation_manager.get_aircraft_in_collision(current_tick)
+        aircraft_list = self.simulation_manager.aircraft_list
+        indices, frame_positions, collision_flags = self.simulation_manager.get_frame(current_tick)
         
-        for aircraft in self.simulation_manager.aircraft_list:
-            pos = positions[aircraft.id]
-            if pos is not None:
-                in_collision = aircraft.id in aircraft_in_collision
-                self.renderer.draw_aircraft(aircraft, pos, in_collision, self.blink_state)
+        for index, pos, in_collision in zip(indices, frame_positions, collision_flags):
+            self.renderer.draw_aircraft(aircraft_list[index], pos, in_collision, self.blink_state)
         
         # Info panel
         collisions_at_tick = self.simulation_manager.get_collisions_at_tick(current_tick)
@@ -288,7 +280,7 @@ class VisualizationApp:
         current_gen = self.generation_dropdown.get_value()
         
         # Calcola avg_departure_delay per la generazione corrente
-        total_departure_delay = sum(aircraft.departure_time for aircraft in self.simulation_manager.aircraft_list)
+        total_departure_delay = self.simulation_manager.total_departure_delay
         from config.config import NUM_AIRCRAFT
         avg_departure_delay = total_departure_delay / NUM_AIRCRAFT
         